@@ -0,0 +1 @@
+python3 benchmark.py "$@"
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""Benchmarks for the markdown-to-HTML pipeline.
+
+Generates synthetic corpora, times each pipeline stage on them and writes
+the results as JSON. Pass --compare with an earlier results file to flag
+stages that got slower.
+
+    python3 benchmark.py --output bench_results.json
+    python3 benchmark.py --compare bench_results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from functions import extract_markdown_images, extract_markdown_links, generate_pages_recursive
+from functions import markdown_to_blocks, markdown_to_html_node, split_nodes_delimiter, text_to_textnodes
+from textnode import TextNode, TextType, text_node_to_html_node
+
+WORDS = (
+    "elf dwarf ring shire mordor valar maiar gondolin balrog rivendell "
+    "hobbit wizard river mountain forest tower song light shadow king"
+).split()
+
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _inline(rng):
+    # A sentence with a sprinkling of every inline construct
+    parts = [_sentence(rng, 6), f"**{rng.choice(WORDS)}**", _sentence(rng, 4),
+             f"_{rng.choice(WORDS)}_", f"`{rng.choice(WORDS)}`", _sentence(rng, 3)]
+    if rng.random() < 0.3:
+        parts.append(f"[{rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})")
+    if rng.random() < 0.1:
+        parts.append(f"![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)")
+    return " ".join(parts)
+
+
+def _page(rng, blocks, links=0, lists=0):
+    out = [f"# {_sentence(rng, 4)}"]
+    for i in range(blocks):
+        kind = i % 6
+        if kind == 0:
+            out.append(f"## {_sentence(rng, 3)}")
+        elif kind == 1:
+            out.append("\n".join(_inline(rng) for _ in range(3)))
+        elif kind == 2:
+            out.append("> " + _inline(rng))
+        elif kind == 3:
+            out.append("\n".join(f"- {_inline(rng)}" for _ in range(4 + lists)))
+        elif kind == 4:
+            out.append("\n".join(f"{n}. {_inline(rng)}" for n in range(1, 4 + lists)))
+        else:
+            out.append("```\n" + "\n".join(_sentence(rng, 8) for _ in range(4)) + "\n```")
+        if links:
+            out.append(" ".join(f"[{rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})" for _ in range(links)))
+    return "\n\n".join(out) + "\n"
+
+
+def make_corpora(scale=1, seed=0):
+    """Return {name: [markdown pages]} for each synthetic corpus."""
+    rng = random.Random(seed)
+    return {
+        "small_posts": [_page(rng, 6) for _ in range(200 * scale)],
+        "huge_pages": [_page(rng, 3000 * scale) for _ in range(2)],
+        "link_heavy": [_page(rng, 30, links=40) for _ in range(20 * scale)],
+        "list_heavy": [_page(rng, 30, lists=40) for _ in range(20 * scale)],
+    }
+
+
+def _time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times), "repeat": repeat}
+
+
+@contextlib.contextmanager
+def _site(pages):
+    # Write the corpus to a throwaway content tree; yields a build function
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        os.makedirs(content)
+        for i, page in enumerate(pages):
+            with open(os.path.join(content, f"page{i}.md"), "w", encoding="utf-8") as f:
+                f.write(page)
+        template = os.path.join(tmp, "template.html")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write(TEMPLATE)
+
+        def build():
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, template, os.path.join(tmp, "docs"))
+
+        yield build
+
+
+def run(corpora, repeat):
+    results = {}
+    for name, pages in corpora.items():
+        blocks = [block for page in pages for block in markdown_to_blocks(page)]
+        paragraphs = [block.replace("\n", " ") for block in blocks if block[0].isalpha()]
+        trees = [markdown_to_html_node(page) for page in pages]
+        text_nodes = [node for p in paragraphs for node in text_to_textnodes(p)]
+        plain_nodes = [TextNode(p) for p in paragraphs]
+        size = sum(len(page.encode("utf-8")) for page in pages)
+        with _site(pages) as build:
+            stages = {
+                "text_to_textnodes": lambda: [text_to_textnodes(p) for p in paragraphs],
+                "markdown_to_blocks": lambda: [markdown_to_blocks(page) for page in pages],
+                "markdown_to_html_node": lambda: [markdown_to_html_node(page) for page in pages],
+                "to_html": lambda: [tree.to_html() for tree in trees],
+                # Per-call micro-benchmarks of the inline helpers
+                "extract_markdown_links": lambda: [extract_markdown_links(p) for p in paragraphs],
+                "extract_markdown_images": lambda: [extract_markdown_images(p) for p in paragraphs],
+                "split_nodes_delimiter": lambda: [split_nodes_delimiter([n], "**", TextType.BOLD) for n in plain_nodes],
+                "text_node_to_html_node": lambda: [text_node_to_html_node(n) for n in text_nodes],
+                "generate_pages_recursive": build,
+            }
+            calls = {
+                "extract_markdown_links": len(paragraphs),
+                "extract_markdown_images": len(paragraphs),
+                "split_nodes_delimiter": len(plain_nodes),
+                "text_node_to_html_node": len(text_nodes),
+            }
+            for stage, func in stages.items():
+                result = _time(func, repeat)
+                result["pages"] = len(pages)
+                result["bytes"] = size
+                if stage in calls:
+                    result["calls"] = calls[stage]
+                    result["per_call_us"] = result["min_s"] / max(calls[stage], 1) * 1e6
+                results[f"{name}/{stage}"] = result
+                print(f"{name:<12} {stage:<26} min {result['min_s'] * 1000:9.2f} ms  median {result['median_s'] * 1000:9.2f} ms")
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-stage ratios against a saved run; return the regressed keys."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0%}):")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result["min_s"] / baseline[key]["min_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"  {key:<40} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the markdown-to-HTML pipeline.")
+    parser.add_argument("--scale", type=int, default=1, help="multiply corpus sizes by this factor")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per stage (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for corpus generation")
+    parser.add_argument("--output", "-o", help="write JSON results to this file")
+    parser.add_argument("--compare", help="JSON results from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio reported as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    results = run(make_corpora(args.scale, args.seed), args.repeat)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": args.scale,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
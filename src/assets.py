@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+
+from manifest import hash_file
+
+FINGERPRINT_LENGTH = 8
+
+
+def fingerprint_path(rel_path, digest):
+    """Return `rel_path` with a content hash before its extension: index.3f9a1c2b.css."""
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+class AssetManifest:
+    """Maps each static file to its content-fingerprinted name.
+
+    `files` maps relative source paths to fingerprinted relative paths,
+    `urls` maps the same as root-relative URLs for rewriting href/src, and
+    `digest` identifies the whole mapping so caches keyed on it are
+    invalidated when any asset changes.
+
+    `images` maps image URLs to their responsive variants, as returned by
+    images.responsive_images(); it is part of the digest too.
+    """
+
+    def __init__(self, files, stamps=None, images=None):
+        self.files = files
+        self.stamps = stamps if stamps is not None else {}
+        self.urls = {
+            "/" + rel_path.replace(os.sep, "/"): "/" + fingerprinted.replace(os.sep, "/")
+            for rel_path, fingerprinted in files.items()
+        }
+        self.set_images(images or {})
+
+    def set_images(self, images):
+        self.images = images
+        encoded = json.dumps([sorted(self.files.items()), sorted(images.items())]).encode("utf-8")
+        self.digest = hashlib.sha256(encoded).hexdigest()
+
+    @classmethod
+    def from_dir(cls, static_dir, known_stamps=None, fingerprint=True):
+        """Fingerprint every file under `static_dir`.
+
+        `known_stamps` is the `stamps` of a previous build,
+        {rel_path: [size, mtime_ns, sha256]}; files whose size and mtime
+        match reuse the stored hash instead of being read again. Without
+        `fingerprint` the files are only hashed and keep their names.
+        """
+        known_stamps = known_stamps or {}
+        files = {}
+        stamps = {}
+        for root, _, names in os.walk(static_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                rel_path = os.path.normpath(os.path.relpath(path, static_dir))
+                stat = os.stat(path)
+                known = known_stamps.get(rel_path)
+                if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                    digest = known[2]
+                else:
+                    digest = hash_file(path)
+                stamps[rel_path] = [stat.st_size, stat.st_mtime_ns, digest]
+                if fingerprint:
+                    files[rel_path] = fingerprint_path(rel_path, digest)
+        return cls(files, stamps)
+
+    def write(self, path):
+        """Write the source-to-fingerprinted URL mapping as JSON."""
+        data = {url[1:]: fingerprinted[1:] for url, fingerprinted in self.urls.items()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
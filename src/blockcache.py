@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+# Bump when block or inline rendering changes so persisted fragments are discarded
+CACHE_VERSION = 3
+
+# The cache generate_page renders through, or None when caching is off
+_cache = None
+
+
+def block_key(block, basepath="/", salt=""):
+    """Return the cache key for a markdown block rendered under `basepath`.
+
+    `salt` covers any other input the rendering depends on, such as the
+    asset manifest digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(basepath.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(salt.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(block.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BlockCache:
+    """LRU map from block key to the block's [rendered HTML, searchable text, link URLs]."""
+
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # List of (key, entry) pairs put since it was set, or None
+        self.added = None
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        if self.added is not None:
+            self.added.append((key, entry))
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        """Read persisted entries from `path`, if it exists and matches CACHE_VERSION."""
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        for key, entry in data.get("entries", []):
+            self.put(key, entry)
+
+    def save(self):
+        if self.path is None:
+            return
+        data = {"version": CACHE_VERSION, "entries": list(self.entries.items())}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+
+def enable(maxsize=4096, path=None):
+    """Make a new BlockCache the active one, loading `path` if given."""
+    global _cache
+    _cache = BlockCache(maxsize, path)
+    _cache.load()
+    return _cache
+
+
+def disable():
+    global _cache
+    _cache = None
+
+
+def active():
+    return _cache
@@ -14,53 +14,84 @@ class BlockType(Enum):
     HEADING6 = 11
 
 
+HEADING_TYPES = (
+    BlockType.HEADING,
+    BlockType.HEADING2,
+    BlockType.HEADING3,
+    BlockType.HEADING4,
+    BlockType.HEADING5,
+    BlockType.HEADING6,
+)
+
+# Block type -> HTML tag
+BLOCK_TAGS = {
+    BlockType.PARAGRAPH: "p",
+    BlockType.HEADING: "h1",
+    BlockType.HEADING2: "h2",
+    BlockType.HEADING3: "h3",
+    BlockType.HEADING4: "h4",
+    BlockType.HEADING5: "h5",
+    BlockType.HEADING6: "h6",
+    BlockType.CODE: "pre",
+    BlockType.QUOTE: "blockquote",
+    BlockType.UNORDERDED_LIST: "ul",
+    BlockType.ORDERED_LIST: "ol",
+}
+
+# Block type -> handler(block, tag) returning the block's HTMLNode. The
+# handlers for the built-in types are registered by functions.py.
+BLOCK_HANDLERS = {}
+
+# First character of a block -> matchers tried in registration order. A
+# matcher returns a block type or None; blocks nothing claims are paragraphs.
+_MATCHERS = {}
+
+
+def register_block_type(block_type, first_chars, matcher, tag=None, handler=None):
+    """Register a block kind.
+
+    `matcher(block)` is only consulted for blocks starting with one of
+    `first_chars` and returns a block type or None. `tag` and `handler` are
+    added to BLOCK_TAGS and BLOCK_HANDLERS when given.
+    """
+    for char in first_chars:
+        _MATCHERS.setdefault(char, []).append(matcher)
+    if tag is not None:
+        BLOCK_TAGS[block_type] = tag
+    if handler is not None:
+        BLOCK_HANDLERS[block_type] = handler
+
+
+def _match_heading(block_str):
+    level = len(block_str) - len(block_str.lstrip("#"))
+    return HEADING_TYPES[min(level, 6) - 1]
+
+
+def _match_unordered_list(block_str):
+    return BlockType.UNORDERDED_LIST if block_str.startswith("- ") else None
+
+
+def _match_ordered_list(block_str):
+    return BlockType.ORDERED_LIST if ". " in block_str[:4] else None
+
+
+register_block_type(BlockType.HEADING, "#", _match_heading)
+register_block_type(BlockType.CODE, "`", lambda block_str: BlockType.CODE)
+register_block_type(BlockType.QUOTE, ">", lambda block_str: BlockType.QUOTE)
+register_block_type(BlockType.UNORDERDED_LIST, "-", _match_unordered_list)
+register_block_type(BlockType.ORDERED_LIST, "0123456789", _match_ordered_list)
+
+
 def block_to_block_type(block_str):
-    if block_str.startswith("#"):
-        if block_str.startswith("##"):
-            if block_str.startswith("###"):
-                if block_str.startswith("####"):
-                    if block_str.startswith("#####"):
-                        if block_str.startswith("######"):
-                            return BlockType.HEADING6
-                        return BlockType.HEADING5
-                    return BlockType.HEADING4
-                return BlockType.HEADING3
-            return BlockType.HEADING2
-        return BlockType.HEADING
-    elif block_str.startswith("`"):
-        return BlockType.CODE
-    elif block_str.startswith(">"):
-        return BlockType.QUOTE
-    elif block_str.startswith("- "):
-        return BlockType.UNORDERDED_LIST
-    elif block_str[0].isdigit() and ". " in block_str[:4]:
-        return BlockType.ORDERED_LIST
-    else:
-        return BlockType.PARAGRAPH
+    for matcher in _MATCHERS.get(block_str[:1], ()):
+        block_type = matcher(block_str)
+        if block_type is not None:
+            return block_type
+    return BlockType.PARAGRAPH
 
 
 def block_type_to_html_tag(block_type):
-    if block_type == BlockType.PARAGRAPH:
-        return "p"
-    elif block_type == BlockType.HEADING:
-        return "h1"
-    elif block_type == BlockType.HEADING2:
-        return "h2"
-    elif block_type == BlockType.HEADING3:
-        return "h3"
-    elif block_type == BlockType.HEADING4:
-        return "h4"
-    elif block_type == BlockType.HEADING5:
-        return "h5"
-    elif block_type == BlockType.HEADING6:
-        return "h6"
-    elif block_type == BlockType.CODE:
-        return "pre"
-    elif block_type == BlockType.QUOTE:
-        return "blockquote"
-    elif block_type == BlockType.UNORDERDED_LIST:
-        return "ul"
-    elif block_type == BlockType.ORDERED_LIST:
-        return "ol"
-    else:
-        raise ValueError("Unsupported BlockType")
+    try:
+        return BLOCK_TAGS[block_type]
+    except KeyError:
+        raise ValueError("Unsupported BlockType") from None
@@ -0,0 +1,58 @@
+import contextlib
+
+
+class Collector:
+    """Routes what pages render to one build feature, such as search.
+
+    enable() sets the target generate_page reports finished pages to, and
+    collecting() gathers the values add()ed while a page is rendered. A
+    feature module keeps one Collector and exposes its methods.
+    """
+
+    def __init__(self):
+        self.target = None
+        self._sink = None
+
+    def enable(self, target):
+        self.target = target
+        return target
+
+    def disable(self):
+        self.target = None
+
+    def active(self):
+        return self.target
+
+    def add(self, values):
+        if self._sink is not None:
+            self._sink.extend(values)
+
+    @contextlib.contextmanager
+    def collecting(self, enabled=True):
+        """Gather the values added inside the block into a list.
+
+        Nested use is allowed; the inner list is not added to the outer one.
+        When not `enabled`, nothing is gathered and the list stays empty.
+        """
+        if not enabled:
+            yield []
+            return
+        outer = self._sink
+        self._sink = []
+        try:
+            yield self._sink
+        finally:
+            self._sink = outer
+
+
+class PageRecorder:
+    """Stand-in target for worker processes that records add_page() calls.
+
+    The parent replays `records` into the real target.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def add_page(self, *args):
+        self.records.append(args)
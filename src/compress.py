@@ -0,0 +1,97 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+SIDECAR_EXTENSIONS = {"gzip": ".gz", "br": ".br"}
+MIN_SIZE = 1024
+
+
+def parse_formats(spec):
+    """Parse a comma-separated list such as "gzip,br" into a tuple of formats."""
+    formats = tuple(part.strip() for part in spec.split(",") if part.strip())
+    for fmt in formats:
+        if fmt not in SIDECAR_EXTENSIONS:
+            raise ValueError(f"Unsupported compression format {fmt!r}, expected gzip or br")
+    if "br" in formats:
+        _load_brotli()
+    return formats
+
+
+def _load_brotli():
+    try:
+        import brotli
+    except ImportError:
+        raise ValueError("Brotli sidecars need the brotli package: pip install brotli") from None
+    return brotli
+
+
+def _compress(data, fmt, level):
+    if fmt == "gzip":
+        # mtime=0 keeps the output reproducible
+        return gzip.compress(data, compresslevel=9 if level is None else min(level, 9), mtime=0)
+    return _load_brotli().compress(data, quality=11 if level is None else level)
+
+
+def _is_current(sidecar, stat):
+    # Sidecars carry their source's mtime, so a matching mtime means the
+    # source has not been rewritten since
+    try:
+        return os.stat(sidecar).st_mtime_ns == stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path, formats=("gzip",), level=None, min_size=MIN_SIZE, force=False):
+    """Write a compressed sidecar next to `path` for each format that is stale.
+
+    Files smaller than `min_size` get no sidecars, and any left from an
+    earlier build are removed. With `force`, current sidecars are rewritten
+    too, e.g. after a level change. Returns the number of sidecars written.
+    """
+    stat = os.stat(path)
+    written = 0
+    data = None
+    for fmt in formats:
+        sidecar = path + SIDECAR_EXTENSIONS[fmt]
+        if stat.st_size < min_size:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            continue
+        if not force and _is_current(sidecar, stat):
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        tmp = f"{sidecar}.tmp-{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(_compress(data, fmt, level))
+        os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp, sidecar)
+        written += 1
+    return written
+
+
+def compress_tree(dest_dir, formats=("gzip",), level=None, min_size=MIN_SIZE, workers=None, force=False):
+    """Write sidecars for every compressible file under `dest_dir`.
+
+    Files are compressed on a thread pool (zlib and brotli release the GIL
+    while compressing). Sidecars whose source file is gone, or of a format
+    no longer requested, are deleted. `force` is passed on to
+    compress_file(). Returns (written, checked): sidecars written and
+    source files looked at.
+    """
+    paths = []
+    sidecar_exts = tuple(SIDECAR_EXTENSIONS.values())
+    wanted_exts = tuple(SIDECAR_EXTENSIONS[fmt] for fmt in formats)
+    for root, _, names in os.walk(dest_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            if name.endswith(sidecar_exts) and name[:-3].endswith(COMPRESSIBLE_EXTENSIONS):
+                if not name.endswith(wanted_exts) or not os.path.exists(path[:-3]):
+                    os.remove(path)
+            elif name.endswith(COMPRESSIBLE_EXTENSIONS):
+                paths.append(path)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compress") as pool:
+        written = sum(pool.map(lambda path: compress_file(path, formats, level, min_size, force), paths))
+    return written, len(paths)
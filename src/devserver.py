@@ -0,0 +1,275 @@
+import http.server
+import os
+import threading
+import time
+
+import linkgraph
+import search
+from frontmatter import page_template, read_front_matter
+from functions import find_pages, generate_page, generate_pages_recursive, page_dest_path, page_hash, sync_file
+from manifest import hash_file
+
+LIVERELOAD_PATH = "/__livereload"
+_LIVERELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVERELOAD_PATH}").onmessage = function () {{ location.reload(); }};</script>'
+).encode("utf-8")
+
+
+class ReloadNotifier:
+    """Version counter that live-reload connections block on."""
+
+    def __init__(self):
+        self.version = 0
+        self._condition = threading.Condition()
+
+    def notify(self):
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version, timeout=None):
+        # Return the current version once it differs from `version` or on timeout
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+def make_handler(directory, notifier):
+    class DevRequestHandler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def do_GET(self):
+            if self.path == LIVERELOAD_PATH:
+                self._stream_reloads()
+                return
+            path = self.translate_path(self.path)
+            if os.path.isdir(path):
+                path = os.path.join(path, "index.html")
+            if path.endswith(".html") and os.path.isfile(path) and self.path.endswith(("/", ".html")):
+                self._send_html(path)
+                return
+            super().do_GET()
+
+        def _send_html(self, path):
+            # Serve the page with the live-reload script injected before </body>
+            with open(path, "rb") as f:
+                body = f.read()
+            index = body.rfind(b"</body>")
+            if index == -1:
+                body += _LIVERELOAD_SCRIPT
+            else:
+                body = body[:index] + _LIVERELOAD_SCRIPT + body[index:]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream_reloads(self):
+            # Server-sent events: one "reload" message per rebuild
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            version = notifier.version
+            try:
+                while True:
+                    current = notifier.wait(version, timeout=15)
+                    if current != version:
+                        version = current
+                        self.wfile.write(b"data: reload\n\n")
+                    else:
+                        self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+        def log_message(self, format, *args):
+            pass
+
+    return DevRequestHandler
+
+
+def serve(directory, port, notifier):
+    """Serve `directory` on `port` from a background thread; return the server."""
+    server = http.server.ThreadingHTTPServer(("", port), make_handler(directory, notifier))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def snapshot(paths):
+    """Return {file path: (mtime_ns, size)} for the files and directories in `paths`."""
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, _, names in os.walk(path):
+            for name in names:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class SiteWatcher:
+    """Polls the site sources and rebuilds only what a change affects.
+
+    A changed page is regenerated on its own and a changed static file is
+    re-synced on its own; a template change rebuilds every page, and a
+    change to a template named in front matter the pages naming it.
+
+    With `assets` (an AssetManifest), pages link to fingerprinted names and
+    `publish_assets(manifest)` re-syncs static files instead, returning the
+    new AssetManifest; every page is rebuilt when its digest changes.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath, manifest, link="copy",
+                 assets=None, publish_assets=None, large_file_size=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest = manifest
+        self.link = link
+        self.assets = assets
+        self.publish_assets = publish_assets
+        self.large_file_size = large_file_size
+        # {page source: the template its front matter names}
+        self.page_templates = {}
+        for src_path, _ in find_pages(content_dir, dest_dir):
+            try:
+                self._track_template(src_path, read_front_matter(src_path))
+            except ValueError:
+                pass
+        self.files = snapshot(self._paths())
+
+    def _paths(self):
+        return (self.content_dir, self.static_dir, self.template_path, *sorted(set(self.page_templates.values())))
+
+    def _track_template(self, src_path, front):
+        if not front.get("template"):
+            self.page_templates.pop(src_path, None)
+            return
+        self.page_templates[src_path] = page_template(self.template_path, front)
+
+    def poll(self):
+        """Apply any changes since the last poll; return True if anything changed."""
+        files = snapshot(self._paths())
+        changed = [path for path, stamp in files.items() if self.files.get(path) != stamp]
+        removed = [path for path in self.files if path not in files]
+        self.files = files
+        if not changed and not removed:
+            return False
+        start = time.perf_counter()
+        self.apply(changed, removed)
+        print(f"Rebuilt {len(changed) + len(removed)} changed file(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return True
+
+    def apply(self, changed, removed):
+        rebuild_all = self.template_path in changed
+        republish = self.publish_assets is not None and any(
+            self._is_under(path, self.static_dir) for path in changed + removed
+        )
+        if republish:
+            digest = self.assets.digest if self.assets is not None else None
+            self.assets = self.publish_assets(self.manifest)
+            rebuild_all = rebuild_all or self.assets is None or self.assets.digest != digest
+        for path in removed:
+            if self._is_under(path, self.static_dir):
+                if not republish:
+                    self._remove_asset(path)
+            elif path.endswith(".md"):
+                self.manifest.remove(path)
+                self.page_templates.pop(path, None)
+        pages = set()
+        for path in changed:
+            if path == self.template_path:
+                continue
+            if self._is_under(path, self.static_dir):
+                if not republish:
+                    self._sync_asset(path)
+            elif path.endswith(".md"):
+                pages.add(path)
+            else:
+                pages.update(src_path for src_path, template in self.page_templates.items() if template == path)
+        if rebuild_all:
+            self._rebuild_all()
+        else:
+            for path in sorted(pages):
+                self._rebuild_page(path)
+        self.manifest.save()
+        index = search.active()
+        if index is not None:
+            index.prune(self.manifest.pages)
+            index.save()
+        graph = linkgraph.active()
+        if graph is not None:
+            graph.prune(self.manifest.pages)
+            graph.save()
+
+    def _is_under(self, path, directory):
+        return os.path.commonpath([os.path.abspath(path), os.path.abspath(directory)]) == os.path.abspath(directory)
+
+    def _rebuild_all(self):
+        # Every page depends on the template and assets, so none is current
+        self.manifest.template_hash = hash_file(self.template_path)
+        self.manifest.invalidate_all()
+        try:
+            generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir, self.basepath,
+                                     self.manifest, assets=self.assets, large_file_size=self.large_file_size)
+        except Exception as e:
+            print(f"Build failed: {type(e).__name__}: {e}")
+
+    def _rebuild_page(self, src_path):
+        dest_path = page_dest_path(src_path, self.content_dir, self.dest_dir)
+        try:
+            front = read_front_matter(src_path)
+            self._track_template(src_path, front)
+            template = self.page_templates.get(src_path)
+            if template is not None and template not in self.files:
+                # Watch a newly named template from now on
+                self.files.update(snapshot([template]))
+            if front.get("draft") is True:
+                print(f"Skipping draft {src_path}")
+                self.manifest.remove(src_path)
+                return
+            meta = generate_page(src_path, self.template_path, dest_path, self.basepath, assets=self.assets,
+                                 large_file_size=self.large_file_size)
+            src_hash = page_hash(src_path, self.template_path, front)
+        except Exception as e:
+            print(f"Failed to generate {src_path}: {type(e).__name__}: {e}")
+            return
+        self.manifest.record(src_path, dest_path, src_hash, meta)
+
+    def _asset_rel_path(self, path):
+        return os.path.normpath(os.path.relpath(path, self.static_dir))
+
+    def _sync_asset(self, path):
+        rel_path = self._asset_rel_path(path)
+        sync_file(path, os.path.join(self.dest_dir, rel_path), link=self.link)
+        assets = set(self.manifest.assets or ())
+        assets.add(rel_path)
+        self.manifest.assets = sorted(assets)
+
+    def _remove_asset(self, path):
+        rel_path = self._asset_rel_path(path)
+        dest = os.path.join(self.dest_dir, rel_path)
+        if os.path.isfile(dest):
+            os.remove(dest)
+        self.manifest.assets = sorted(set(self.manifest.assets or ()) - {rel_path})
+
+    def watch(self, notifier, interval=0.05):
+        while True:
+            if self.poll():
+                notifier.notify()
+            time.sleep(interval)
@@ -0,0 +1,113 @@
+import os
+from datetime import datetime
+
+DELIMITER = "---"
+
+_BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+
+
+def _scalar(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if " #" in text:
+        text = text.split(" #", 1)[0].rstrip()
+    if text.lower() in _BOOLEANS:
+        return _BOOLEANS[text.lower()]
+    if text.startswith("[") and text.endswith("]"):
+        return [_scalar(item) for item in text[1:-1].split(",") if item.strip()]
+    return text
+
+
+def parse_front_matter(lines):
+    """Parse the YAML-style `key: value` lines between the --- delimiters.
+
+    Supports quoted and plain strings, true/false, [a, b] lists and
+    "- item" block lists. `tags` is always a list and `date` must be an
+    ISO date. Raises ValueError on anything else.
+    """
+    meta = {}
+    key = None
+    for number, line in enumerate(lines, start=2):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None and line[0] in " -":
+            if not isinstance(meta[key], list):
+                if meta[key] != "":
+                    raise ValueError(f"Front matter line {number}: list item under non-list key {key!r}")
+                meta[key] = []
+            meta[key].append(_scalar(stripped[2:]))
+            continue
+        name, sep, value = line.partition(":")
+        if not sep or not name.strip() or name != name.lstrip():
+            raise ValueError(f"Front matter line {number}: expected 'key: value', got {line.strip()!r}")
+        key = name.strip()
+        meta[key] = _scalar(value)
+
+    tags = meta.get("tags")
+    if isinstance(tags, str):
+        meta["tags"] = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    if "date" in meta:
+        try:
+            datetime.fromisoformat(str(meta["date"]))
+        except ValueError:
+            raise ValueError(f"Front matter date {meta['date']!r} is not an ISO date") from None
+    return meta
+
+
+def split_front_matter(markdown):
+    """Return (metadata, body) for a page's full text.
+
+    Text that does not start with a --- line, or whose first --- line is
+    never closed, has no front matter and is returned unchanged with empty
+    metadata.
+    """
+    if not markdown.startswith(DELIMITER):
+        return {}, markdown
+    lines = markdown.split("\n")
+    if lines[0].rstrip() != DELIMITER:
+        return {}, markdown
+    for end in range(1, len(lines)):
+        if lines[end].rstrip() == DELIMITER:
+            return parse_front_matter(lines[1:end]), "\n".join(lines[end + 1:])
+    return {}, markdown
+
+
+def skip_front_matter(f):
+    """Read the front matter at the start of the text file `f` and return it.
+
+    Only the header lines are read, leaving `f` positioned at the first body
+    line; a file without front matter, or with an unclosed header, is
+    rewound to its start.
+    """
+    first = f.readline()
+    if first.rstrip() != DELIMITER:
+        f.seek(0)
+        return {}
+    lines = []
+    for line in iter(f.readline, ""):
+        if line.rstrip() == DELIMITER:
+            return parse_front_matter([line.rstrip("\n") for line in lines])
+        lines.append(line)
+    f.seek(0)
+    return {}
+
+
+def read_front_matter(path):
+    """Return the front matter of the page at `path` without reading its body."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return skip_front_matter(f)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def page_template(template_path, meta):
+    """Return the template a page renders with.
+
+    A `template` key is resolved next to the default `template_path`.
+    """
+    if not meta.get("template"):
+        return template_path
+    return os.path.join(os.path.dirname(template_path), meta["template"])
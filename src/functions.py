@@ -1,15 +1,30 @@
+import contextlib
+import io
 import re
 import os
 import shutil
-
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import blockcache
+import linkgraph
+import profiling
+import search
+from blockcache import block_key
+from blocks import BLOCK_HANDLERS, HEADING_TYPES, BlockType, block_to_block_type, block_type_to_html_tag
+from collector import PageRecorder
+from frontmatter import page_template, read_front_matter, skip_front_matter, split_front_matter
+from leafnode import LeafNode
+from manifest import hash_file
 from parentnode import ParentNode
-from textnode import text_node_to_html_node
+from shards import select_shard
+from template import load_template
+from textnode import TextNode, TextType, text_node_to_html_node
+from writer import OutputWriter, write_output
 
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
-    from textnode import TextNode, TextType
-
     new_nodes = []
     for node in old_nodes:
         if node.text_type != TextType.PLAIN:
@@ -38,173 +53,264 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+_IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_images(text):
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return _IMAGE_RE.findall(text)
     
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return _LINK_RE.findall(text)
 
 
-def split_nodes_image(old_nodes):
-    from textnode import TextNode, TextType
-
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    # Split each PLAIN node on every match of `pattern` in one finditer pass;
+    # group 1 is the node text and group 2 its url.
     new_nodes = []
     for node in old_nodes:
         if node.text_type != TextType.PLAIN:
             new_nodes.append(node)
             continue
 
-        extracted = extract_markdown_images(text=node.text)
-        if not extracted:
+        text = node.text
+        last = 0
+        for match in pattern.finditer(text):
+            # Add text before the match
+            if match.start() > last:
+                new_nodes.append(TextNode(text[last:match.start()], TextType.PLAIN))
+            new_nodes.append(TextNode(match.group(1), text_type, url=match.group(2)))
+            last = match.end()
+
+        if last == 0:
+            # No matches -> keep node as-is
             new_nodes.append(node)
-            continue
-        
-        # Process first image
-        image_alt = extracted[0][0]
-        image_link = extracted[0][1]
-        sections = node.text.split(f"![{image_alt}]({image_link})", 1)
-        
-        # Add text before image
-        if sections[0]:
-            new_nodes.append(TextNode(sections[0], TextType.PLAIN))
-        
-        # Add image node
-        new_nodes.append(TextNode(image_alt, TextType.IMAGE, url=image_link))
-        
-        # Recursively process remaining text for more images
-        if len(sections) > 1 and sections[1]:
-            remaining_nodes = split_nodes_image([TextNode(sections[1], TextType.PLAIN)])
-            new_nodes.extend(remaining_nodes)
-            
+        elif last < len(text):
+            new_nodes.append(TextNode(text[last:], TextType.PLAIN))
+
     return new_nodes
 
+
+def split_nodes_image(old_nodes):
+    return _split_nodes_pattern(old_nodes, _IMAGE_RE, TextType.IMAGE)
+
+
 def split_nodes_link(old_nodes):
-    from textnode import TextNode, TextType
+    return _split_nodes_pattern(old_nodes, _LINK_RE, TextType.LINK)
 
-    new_nodes = []
-    for node in old_nodes:
-        if node.text_type != TextType.PLAIN:
-            new_nodes.append(node)
-            continue
 
-        extracted = extract_markdown_links(text=node.text)
-        if not extracted:
-            new_nodes.append(node)
-            continue
-        
-        # Process first link
-        link_text = extracted[0][0]
-        link_url = extracted[0][1]
-        sections = node.text.split(f"[{link_text}]({link_url})", 1)
-        
-        # Add text before link
-        if sections[0]:
-            new_nodes.append(TextNode(sections[0], TextType.PLAIN))
-        
-        # Add link node
-        new_nodes.append(TextNode(link_text, TextType.LINK, url=link_url))
-        
-        # Recursively process remaining text for more links
-        if len(sections) > 1 and sections[1]:
-            remaining_nodes = split_nodes_link([TextNode(sections[1], TextType.PLAIN)])
-            new_nodes.extend(remaining_nodes)
-            
-    return new_nodes
+# Inline delimiters in the order they are tried at a given position. Longer
+# markers come first so "__" wins over "_".
+_INLINE_DELIMITERS = (
+    ("`", TextType.CODE),
+    ("**", TextType.BOLD),
+    ("__", TextType.ITALIC),
+    ("_", TextType.ITALIC),
+)
+_INLINE_SPECIAL_RE = re.compile(r"[`*_!\[]")
+
 
 def text_to_textnodes(text):
-    from textnode import TextNode, TextType
-    final_nodes = []
+    """Tokenize inline markdown into TextNodes in a single left-to-right scan.
 
-    final_nodes = split_nodes_delimiter([TextNode(text, TextType.PLAIN)], "**", TextType.BOLD)
-    final_nodes = split_nodes_delimiter(final_nodes, "__", TextType.ITALIC)
-    final_nodes = split_nodes_delimiter(final_nodes, "_", TextType.ITALIC)
-    final_nodes = split_nodes_delimiter(final_nodes, "`", TextType.CODE)
-    final_nodes = split_nodes_image(final_nodes)
-    final_nodes = split_nodes_link(final_nodes)
+    Code spans are taken literally, so markers inside them (or inside link
+    and image targets) are never treated as formatting. TextNodes are flat,
+    so the text of emphasis and links is literal too: `[**a**](b)` is a link
+    reading "**a**" and `_a **b** c_` is italic "a **b** c".
+    """
+    with profiling.stage("inline"):
+        return _scan_inline(text)
+
+
+def _scan_inline(text):
+    nodes = []
+    plain = []  # pending literal text, flushed into one PLAIN node
+    pos = 0
+    length = len(text)
+
+    def flush():
+        if plain:
+            nodes.append(TextNode("".join(plain), TextType.PLAIN))
+            plain.clear()
+
+    while pos < length:
+        match = _INLINE_SPECIAL_RE.search(text, pos)
+        if match is None:
+            plain.append(text[pos:])
+            break
+        start = match.start()
+        if start > pos:
+            plain.append(text[pos:start])
+        pos = start
+
+        for delimiter, text_type in _INLINE_DELIMITERS:
+            if text.startswith(delimiter, pos):
+                end = text.find(delimiter, pos + len(delimiter))
+                if end == -1:
+                    raise ValueError("Invalid number of delimiters in text node")
+                inner = text[pos + len(delimiter):end]
+                if inner:
+                    flush()
+                    nodes.append(TextNode(inner, text_type))
+                pos = end + len(delimiter)
+                break
+        else:
+            token = _IMAGE_RE.match(text, pos) or _LINK_RE.match(text, pos)
+            if token is None:
+                plain.append(text[pos])
+                pos += 1
+                continue
+            flush()
+            text_type = TextType.IMAGE if token.re is _IMAGE_RE else TextType.LINK
+            nodes.append(TextNode(token.group(1), text_type, url=token.group(2)))
+            pos = token.end()
 
-    return final_nodes
+    flush()
+    return nodes
 
-def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    formatted = []
-    for block in blocks:
-        if block.strip() == "":
+def _is_fence(line):
+    # A ``` line opens or closes a fenced code block; ```code``` on one line does neither
+    stripped = line.strip()
+    return stripped.startswith("```") and (len(stripped) == 3 or not stripped.endswith("```"))
+
+
+def iter_blocks(lines):
+    """Yield the stripped blocks of markdown read from an iterable of lines.
+
+    Blank lines separate blocks, except inside fenced code blocks, which are
+    kept whole. Works on a file object, so only one block is held at a time.
+    """
+    block = []
+    in_fence = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if _is_fence(line):
+            in_fence = not in_fence
+        elif not in_fence and not line.strip():
+            if block:
+                text = "\n".join(block).strip()
+                if text:
+                    yield text
+                block = []
             continue
-        newblock = block.strip()
-        formatted.append(newblock)
-    return formatted
+        block.append(line)
+    if block:
+        text = "\n".join(block).strip()
+        if text:
+            yield text
+
 
+def markdown_to_blocks(markdown):
+    return list(iter_blocks(markdown.split("\n")))
 
 
-def markdown_to_html_node(markdown):
-    from htmlnode import HTMLNode
-    from leafnode import LeafNode
-    from textnode import TextNode, TextType
-    from blocks import block_to_block_type, block_type_to_html_tag, BlockType
-    
-    blocks = markdown_to_blocks(markdown)
+_ORDERED_ITEM_RE = re.compile(r"\d+\. ")
+
+
+def _list_items(block, ordered):
+    # Split a list block into item texts line by line; lines without a
+    # marker continue the previous item.
+    items = []
+    for line in block.split("\n"):
+        if ordered:
+            match = _ORDERED_ITEM_RE.match(line)
+            marker_end = match.end() if match else None
+        else:
+            marker_end = 2 if line.startswith("- ") else None
+        if marker_end is not None or not items:
+            items.append([line[marker_end or 0:]])
+        else:
+            items[-1].append(line)
+    return ["\n".join(item).strip() for item in items]
+
+
+def markdown_to_html_node(markdown, cache=None, basepath="/", assets=None):
+    # With a BlockCache, each block becomes a raw leaf holding its rendered
+    # HTML (links already rewritten for `basepath` and `assets`), parsed
+    # only on a miss.
+    with profiling.stage("blocks"):
+        blocks = markdown_to_blocks(markdown)
     root = ParentNode(tag="div", children=[])
     for block in blocks:
-        type = block_to_block_type(block)
-        node =  ParentNode(tag=block_type_to_html_tag(type), children=[])
-        if type == BlockType.PARAGRAPH:
-            # Replace newlines with spaces for paragraphs
-            node.value = " ".join(block.split())
-        elif type == BlockType.HEADING:
-            node.value = block.lstrip("# ").strip()
-        elif type == BlockType.HEADING2:
-            node.value = block.lstrip("# ").strip()
-        elif type == BlockType.HEADING3:
-            node.value = block.lstrip("# ").strip()
-        elif type == BlockType.HEADING4:
-            node.value = block.lstrip("# ").strip()
-        elif type == BlockType.HEADING5:
-            node.value = block.lstrip("# ").strip()
-        elif type == BlockType.HEADING6:
-            node.value = block.lstrip("# ").strip()
-        elif type == BlockType.CODE:
-            node.value = block.strip("`").strip()
-        elif type == BlockType.QUOTE:
-            node.value = block.lstrip("> ").strip()
-        elif type == BlockType.UNORDERDED_LIST:
-            items = block.lstrip("- ").split("\n- ")
-            for item in items:
-                item_node = ParentNode(tag="li", children=[])
-                text_nodes = text_to_textnodes(item.strip())
-                for text_node in text_nodes:
-                    html_leaf = text_node_to_html_node(text_node)
-                    item_node.children.append(html_leaf)
-                node.children.append(item_node)
-        elif type == BlockType.ORDERED_LIST:
-            items = re.split(r"\d+\. ", block)[1:]  # Skip the first empty split
-            for item in items:
-                item_node = ParentNode(tag="li", children=[])
-                text_nodes = text_to_textnodes(item.strip())
-                for text_node in text_nodes:
-                    html_leaf = text_node_to_html_node(text_node)
-                    item_node.children.append(html_leaf)
-                node.children.append(item_node)
+        if cache is None:
+            root.children.append(block_to_html_node(block))
         else:
-            raise ValueError("Unsupported BlockType")
-        
-        # Apply inline formatting to paragraphs, headings, and quotes
-        if type in (BlockType.PARAGRAPH, BlockType.HEADING, BlockType.HEADING2, BlockType.HEADING3, 
-                    BlockType.HEADING4, BlockType.HEADING5, BlockType.HEADING6, BlockType.QUOTE):
-            text_nodes = text_to_textnodes(node.value)
-            for text_node in text_nodes:
-                html_leaf = text_node_to_html_node(text_node)
-                node.children.append(html_leaf)
-            node.value = None
-        elif type == BlockType.CODE:
-            node.children = []
-            text_node = TextNode(text=node.value, text_type=TextType.CODE)
-            node.children.append(text_node_to_html_node(text_node))
-            node.value = None
-
-        root.children.append(node)
+            root.children.append(LeafNode(value=_cached_block_html(block, cache, basepath, assets)))
     return root
-    
+
+
+def _cached_block_html(block, cache, basepath, assets):
+    # Entries are [html, searchable text, link urls] so hits still feed the
+    # search index and link graph. Text and links are only kept while those
+    # are active, so that state is part of the key.
+    indexing = search.active() is not None
+    graphing = linkgraph.active() is not None
+    salt = f"{assets.digest if assets is not None else ''}:{indexing:d}{graphing:d}"
+    key = block_key(block, basepath, salt)
+    entry = cache.get(key)
+    if entry is None:
+        with search.collecting(indexing) as text, linkgraph.collecting(graphing) as links:
+            node = block_to_html_node(block)
+        rewrite_links(node, basepath, assets)
+        entry = [node.to_html(), " ".join(text), links]
+        cache.put(key, entry)
+    search.add_text(entry[1])
+    linkgraph.add_links(entry[2])
+    return entry[0]
+
+
+def _inline_children(text):
+    text_nodes = text_to_textnodes(text)
+    search.add_text_nodes(text_nodes)
+    linkgraph.add_text_nodes(text_nodes)
+    return [text_node_to_html_node(text_node) for text_node in text_nodes]
+
+
+def _paragraph_to_html_node(block, tag):
+    # Replace newlines with spaces for paragraphs
+    return ParentNode(tag, _inline_children(" ".join(block.split())))
+
+
+def _heading_to_html_node(block, tag):
+    return ParentNode(tag, _inline_children(block.lstrip("# ").strip()))
+
+
+def _quote_to_html_node(block, tag):
+    return ParentNode(tag, _inline_children(block.lstrip("> ").strip()))
+
+
+def _code_to_html_node(block, tag):
+    text_node = TextNode(text=block.strip("`").strip(), text_type=TextType.CODE)
+    return ParentNode(tag, [text_node_to_html_node(text_node)])
+
+
+def _unordered_list_to_html_node(block, tag):
+    return ParentNode(tag, [ParentNode("li", _inline_children(item)) for item in _list_items(block, ordered=False)])
+
+
+def _ordered_list_to_html_node(block, tag):
+    return ParentNode(tag, [ParentNode("li", _inline_children(item)) for item in _list_items(block, ordered=True)])
+
+
+BLOCK_HANDLERS.update({
+    BlockType.PARAGRAPH: _paragraph_to_html_node,
+    BlockType.CODE: _code_to_html_node,
+    BlockType.QUOTE: _quote_to_html_node,
+    BlockType.UNORDERDED_LIST: _unordered_list_to_html_node,
+    BlockType.ORDERED_LIST: _ordered_list_to_html_node,
+})
+BLOCK_HANDLERS.update({heading: _heading_to_html_node for heading in HEADING_TYPES})
+
+
+def block_to_html_node(block):
+    """Convert a single markdown block into its HTML node."""
+    block_type = block_to_block_type(block)
+    handler = BLOCK_HANDLERS.get(block_type)
+    if handler is None:
+        raise ValueError("Unsupported BlockType")
+    return handler(block, block_type_to_html_tag(block_type))
+
 
 def recursive_copy(src, dest):
     """Recursively copy contents of directory `src` into directory `dest`.
@@ -240,6 +346,134 @@ def recursive_copy(src, dest):
             # Copy regular file
             shutil.copy2(s, d)
 
+# ioctl request number for FICLONE on Linux (clone a file's extents)
+_FICLONE = 0x40049409
+
+
+def _files_match(src, dest, checksum):
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src)
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(src) == hash_file(dest)
+    return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def _reflink(src, dest):
+    import fcntl
+
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    shutil.copystat(src, dest)
+
+
+def _place_file(src, dest, link):
+    # Write to a temporary name and rename over the destination so readers
+    # never see a missing or half-written file.
+    tmp = f"{dest}.tmp-{os.getpid()}"
+    try:
+        if link == "hardlink":
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copy2(src, tmp)
+        elif link == "reflink":
+            try:
+                _reflink(src, tmp)
+            except (OSError, ImportError):
+                shutil.copy2(src, tmp)
+        else:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def sync_file(src, dest, checksum=False, link="copy"):
+    """Copy one file to `dest` unless it already matches; return True if copied."""
+    if _files_match(src, dest, checksum):
+        return False
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    _place_file(src, dest, link)
+    return True
+
+
+def sync_tree(src, dest, previous=None, checksum=False, link="copy", aliases=None):
+    """Incrementally mirror the files of directory `src` into `dest`.
+
+    Behavior:
+    - Files are copied only when size or mtime differ (or, with `checksum`,
+      when their contents differ). Unchanged files are left alone.
+    - `link` is "copy", "hardlink" or "reflink"; links fall back to a copy
+      when the filesystem does not support them.
+    - `dest` is never cleared. Only files listed in `previous` (the result of
+      the last sync) that no longer exist in `src` are removed, so generated
+      pages living in the same tree are untouched.
+    - `aliases` maps a relative source path to an extra relative destination
+      path the file is also synced to, e.g. its fingerprinted name.
+
+    Returns the sorted list of synced paths, relative to `dest`.
+    """
+
+    if not os.path.isdir(src):
+        raise ValueError("Source must be a directory")
+    if link not in ("copy", "hardlink", "reflink"):
+        raise ValueError(f"Unsupported link mode: {link}")
+
+    synced = []
+    for root, _, files in os.walk(src):
+        rel_root = os.path.relpath(root, src)
+        dest_root = os.path.normpath(os.path.join(dest, rel_root))
+        os.makedirs(dest_root, exist_ok=True)
+        for name in files:
+            s = os.path.join(root, name)
+            d = os.path.join(dest_root, name)
+            if not _files_match(s, d, checksum):
+                _place_file(s, d, link)
+            rel_path = os.path.normpath(os.path.join(rel_root, name))
+            synced.append(rel_path)
+            alias = (aliases or {}).get(rel_path)
+            if alias is not None:
+                if not _files_match(s, os.path.join(dest, alias), checksum):
+                    _place_file(s, os.path.join(dest, alias), link)
+                synced.append(alias)
+
+    current = set(synced)
+    for rel_path in previous or ():
+        if rel_path in current:
+            continue
+        stale = os.path.join(dest, rel_path)
+        if os.path.isfile(stale):
+            os.remove(stale)
+            # Drop directories the removal left empty, stopping at `dest`
+            parent = os.path.dirname(stale)
+            while os.path.normpath(parent) != os.path.normpath(dest):
+                try:
+                    os.rmdir(parent)
+                except OSError:
+                    break
+                parent = os.path.dirname(parent)
+
+    return sorted(synced)
+
+
+def _extract_title_from_file(path):
+    # Same result as extract_title() on the file's body, reading only as far
+    # as the first level-1 heading
+    with open(path, "r", encoding="utf-8") as f:
+        skip_front_matter(f)
+        for line in f:
+            for part in line.splitlines():
+                if part.startswith("# "):
+                    return part[2:].strip()
+    raise ValueError("No level-1 heading found for title extraction")
+
+
 def extract_title(markdown):
     """Extract the title from markdown content.
 
@@ -253,39 +487,368 @@ def extract_title(markdown):
     raise ValueError("No level-1 heading found for title extraction")
 
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def rewrite_links(node, basepath, assets=None):
+    """Prefix root-relative href/src props in the tree under `node` with `basepath`.
+
+    With an AssetManifest, static file URLs are swapped for their
+    fingerprinted names first, and images with responsive variants get
+    width, height, srcset and sizes.
+    """
+    if basepath == "/" and assets is None:
+        return
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.tag == "img" and assets is not None and assets.images:
+            _add_image_size_props(current, basepath, assets)
+        if current.props:
+            for key in ("href", "src"):
+                url = current.props.get(key)
+                if url is not None and url.startswith("/"):
+                    if assets is not None:
+                        url = assets.urls.get(url, url)
+                    current.props[key] = basepath + url[1:]
+        if current.children:
+            stack.extend(current.children)
+
+
+def _add_image_size_props(node, basepath, assets):
+    info = assets.images.get(node.props.get("src"))
+    if info is None:
+        return
+    srcset = ", ".join(
+        f"{basepath}{assets.urls.get(url, url)[1:]} {width}w" for url, width in info["srcset"]
+    )
+    node.props["width"] = str(info["width"])
+    node.props["height"] = str(info["height"])
+    node.props["srcset"] = srcset
+    node.props["sizes"] = info["sizes"]
+
+
+def generate_page(from_path, template_path, dest_path, basepath="/", writer=None, assets=None, large_file_size=None):
     #Generate an HTML page from markdown content using a template.
+    #With an OutputWriter the page is queued for a background write.
+    #With an AssetManifest, static URLs point at fingerprinted files.
+    #Sources of at least `large_file_size` bytes are streamed block by block.
+    #Front matter can set the title and template; see frontmatter.py.
+    #Returns the page's metadata for listings, see page_meta().
 
     print(f"Generating page from {from_path} to {dest_path}")
-    markdown = open(from_path, "r", encoding="utf-8").read()
-    template = open(template_path, "r", encoding="utf-8").read()
-    title = extract_title(markdown)
-    html_node = markdown_to_html_node(markdown)
-    content_html = ""
-    for child in html_node.children:
-        content_html += child.to_html()
-    final_html = template.replace("{{ Title }}", title).replace("{{ Content }}", content_html)
-    final_html = final_html.replace("href=\"/", f"href=\"{basepath}").replace("src=\"/", f"src=\"{basepath}")
-    os.makedirs(dest_path, exist_ok=True)
+    if large_file_size is not None and os.path.getsize(from_path) >= large_file_size:
+        with profiling.page(from_path):
+            return _generate_large_page(from_path, template_path, dest_path, basepath, assets)
+    with profiling.page(from_path):
+        with profiling.stage("read"):
+            with open(from_path, "r", encoding="utf-8") as f:
+                markdown = f.read()
+            front, markdown = split_front_matter(markdown)
+        with profiling.stage("template_load"):
+            template = load_template(page_template(template_path, front), basepath, assets)
+        with profiling.stage("title"):
+            title = str(front["title"]) if front.get("title") else extract_title(markdown)
+        with profiling.stage("html_node"):
+            with (
+                search.collecting(search.active() is not None) as text,
+                linkgraph.collecting(linkgraph.active() is not None) as links,
+            ):
+                html_node = markdown_to_html_node(markdown, blockcache.active(), basepath, assets)
+            rewrite_links(html_node, basepath, assets)
+        with profiling.stage("serialize"):
+            buffer = io.StringIO()
+            for child in html_node.children:
+                child.write_html(buffer)
+        with profiling.stage("template_render"):
+            final_html = template.render(Title=title, Content=buffer.getvalue())
+        with profiling.stage("write"):
+            output_file = os.path.join(dest_path, "index.html")
+            if writer is None:
+                write_output(output_file, final_html.encode("utf-8"))
+            else:
+                writer.submit(output_file, final_html)
+        index = search.active()
+        if index is not None:
+            index.add_page(from_path, dest_path, title, " ".join(text))
+        graph = linkgraph.active()
+        if graph is not None:
+            graph.add_page(from_path, dest_path, links)
+        summary = next((child.to_html() for child in html_node.children if _is_paragraph(child)), "")
+    return page_meta(from_path, title, summary, front)
+
+
+def page_meta(src_path, title, summary, front=None):
+    """Return the metadata listings are built from, stored in the build manifest.
+
+    `summary` is the rendered HTML of the page's first paragraph and
+    `mtime` the source's modification time when it was generated. The
+    `date` and `tags` of the page's front matter are kept when set.
+    """
+    meta = {"title": title, "summary": summary, "mtime": os.path.getmtime(src_path)}
+    for key in ("date", "tags"):
+        if front and front.get(key):
+            meta[key] = front[key]
+    return meta
+
+
+def _is_paragraph(node):
+    # Blocks are ParentNodes, or raw leaves of HTML when the block cache is on
+    if node.tag is None:
+        return node.value.startswith("<p>")
+    return node.tag == "p"
+
+
+# Read and write buffer size for pages streamed in large-file mode
+LARGE_FILE_BUFFER = 1 << 20
+
+
+def _same_contents(path_a, path_b):
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    with open(path_a, "rb") as a, open(path_b, "rb") as b:
+        while True:
+            chunk = a.read(LARGE_FILE_BUFFER)
+            if chunk != b.read(LARGE_FILE_BUFFER):
+                return False
+            if not chunk:
+                return True
+
+
+def _generate_large_page(from_path, template_path, dest_path, basepath, assets):
+    # Read the source line by line, render each block as soon as it is
+    # complete and stream the HTML into a temporary file, so memory use is
+    # bounded by the largest block rather than the whole page. The result is
+    # byte-for-byte what generate_page() produces for small files. Search
+    # terms are counted and link targets gathered block by block, for the
+    # same reason.
+    front = read_front_matter(from_path)
+    with profiling.stage("template_load"):
+        template = load_template(page_template(template_path, front), basepath, assets)
+    with profiling.stage("title"):
+        title = str(front["title"]) if front.get("title") else _extract_title_from_file(from_path)
+    cache = blockcache.active()
     output_file = os.path.join(dest_path, "index.html")
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(final_html) 
-
+    tmp = f"{output_file}.tmp-{os.getpid()}"
+    os.makedirs(dest_path, exist_ok=True)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
-    directory = os.listdir(dir_path_content)
-    for item in directory:
+    summary = []
+    terms = Counter()
+    targets = set()
+
+    def write_content(out):
+        with (
+            open(from_path, "r", encoding="utf-8", buffering=LARGE_FILE_BUFFER) as f,
+            search.collecting(search.active() is not None) as text,
+            linkgraph.collecting(linkgraph.active() is not None) as links,
+        ):
+            skip_front_matter(f)
+            for block in iter_blocks(f):
+                if cache is not None:
+                    node = LeafNode(value=_cached_block_html(block, cache, basepath, assets))
+                else:
+                    node = block_to_html_node(block)
+                    rewrite_links(node, basepath, assets)
+                if not summary and _is_paragraph(node):
+                    summary.append(node.to_html())
+                node.write_html(out)
+                if text:
+                    terms.update(search.tokenize(" ".join(text)))
+                    text.clear()
+                if links:
+                    targets.update(links)
+                    links.clear()
+
+    try:
+        with profiling.stage("stream"):
+            with open(tmp, "w", encoding="utf-8", newline="", buffering=LARGE_FILE_BUFFER) as out:
+                template.write(out, "Content", write_content, Title=title)
+        with profiling.stage("write"):
+            # Leave an identical existing page untouched, like write_output()
+            if os.path.exists(output_file) and _same_contents(tmp, output_file):
+                os.remove(tmp)
+            else:
+                os.replace(tmp, output_file)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    index = search.active()
+    if index is not None:
+        index.add_page(from_path, dest_path, title, "", terms)
+    graph = linkgraph.active()
+    if graph is not None:
+        graph.add_page(from_path, dest_path, sorted(targets))
+    return page_meta(from_path, title, summary[0] if summary else "", front)
+
+
+def _page_dest(item, dest_dir_path):
+    if item == "index.md":
+        # Special case for index.md, output to the parent directory
+        return dest_dir_path
+    # For other .md files, create a subdirectory
+    return os.path.join(dest_dir_path, item.replace(".md", ""))
+
+
+def page_dest_path(src_path, dir_path_content, dest_dir_path):
+    """Return the output directory find_pages() would assign to `src_path`."""
+    rel_dir = os.path.relpath(os.path.dirname(src_path), dir_path_content)
+    if rel_dir != ".":
+        dest_dir_path = os.path.join(dest_dir_path, rel_dir)
+    return _page_dest(os.path.basename(src_path), dest_dir_path)
+
+
+def find_pages(dir_path_content, dest_dir_path):
+    """Return (src_path, dest_path) for every markdown page under `dir_path_content`."""
+    pages = []
+    for item in os.listdir(dir_path_content):
         src_path = os.path.join(dir_path_content, item)
         if os.path.isdir(src_path):
             # If it's a directory, recurse with the same logic
-            dest_path = os.path.join(dest_dir_path, item)
-            generate_pages_recursive(src_path, template_path, dest_path, basepath)
+            pages.extend(find_pages(src_path, os.path.join(dest_dir_path, item)))
         elif item.endswith(".md"):
-            # If it's a markdown file, generate the page
-            if item == "index.md":
-                # Special case for index.md, output to the parent directory
-                dest_path = dest_dir_path
-            else:
-                # For other .md files, create a subdirectory
-                dest_path = os.path.join(dest_dir_path, item.replace(".md", ""))
-            generate_page(src_path, template_path, dest_path, basepath)
\ No newline at end of file
+            pages.append((src_path, _page_dest(item, dest_dir_path)))
+    return pages
+
+
+def page_hash(src_path, template_path, front=None):
+    """Return the hash a BuildManifest records for the page at `src_path`.
+
+    The manifest only tracks the default template, so the template a page
+    names in its front matter is hashed along with the page.
+    """
+    src_hash = hash_file(src_path)
+    if front is None:
+        front = read_front_matter(src_path)
+    if front.get("template"):
+        src_hash += ":" + hash_file(page_template(template_path, front))
+    return src_hash
+
+
+def drop_drafts(pages):
+    """Return the (src_path, dest_path) pages not marked `draft: true`.
+
+    Only the front-matter header of each page is read.
+    """
+    return [(src_path, dest_path) for src_path, dest_path in pages
+            if read_front_matter(src_path).get("draft") is not True]
+
+
+# The AssetManifest of a worker process, set once by _init_worker() instead
+# of being sent with every page
+_worker_assets = None
+
+
+def _init_worker(assets, cache_size):
+    global _worker_assets
+    _worker_assets = assets
+    if cache_size and blockcache.active() is None:
+        # Spawned workers do not inherit the parent's cache
+        blockcache.enable(cache_size)
+
+
+def _generate_page_job(src_path, template_path, dest_path, basepath, profile=False, index=False, graph=False,
+                       large_file_size=None):
+    # Runs in a worker process. The page's log output is captured and handed
+    # back so the parent can print it in one piece, and errors are returned
+    # instead of raised so one bad page does not hide the others. With
+    # `profile`, the page's timings are returned for the parent to merge;
+    # with `index` and `graph`, so are its search index and link graph
+    # records. The page's metadata is always returned, and so are the blocks
+    # it added to the worker's block cache, for the parent's cache to keep.
+    log = io.StringIO()
+    cache = blockcache.active()
+    if cache is not None:
+        cache.added = []
+    profiler = profiling.enable() if profile else None
+    recorder = search.enable(PageRecorder()) if index else None
+    link_recorder = linkgraph.enable(PageRecorder()) if graph else None
+    error = None
+    meta = None
+    try:
+        with contextlib.redirect_stdout(log):
+            meta = generate_page(src_path, template_path, dest_path, basepath, assets=_worker_assets,
+                                 large_file_size=large_file_size)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        profiling.disable()
+        search.disable()
+        linkgraph.disable()
+    profile_data = profiler.export() if profiler is not None else None
+    records = recorder.records if recorder is not None else None
+    link_records = link_recorder.records if link_recorder is not None else None
+    blocks = None
+    if cache is not None:
+        blocks, cache.added = cache.added, None
+    return src_path, log.getvalue(), error, profile_data, records, link_records, meta, blocks
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, jobs=1, writers=4, shard=None, assets=None, large_file_size=None):
+    # With a BuildManifest, pages whose source is unchanged since the last
+    # build are skipped. Call manifest.prune() and manifest.save() afterwards.
+    # With jobs > 1, pages are rendered in a process pool of that size;
+    # otherwise they are written by `writers` background threads.
+    # With shard=(i, N), only the pages of shard i of N are built.
+    # `assets` and `large_file_size` are passed on to generate_page.
+    # Pages marked `draft: true` in their front matter are skipped; only
+    # their header is read. Returns the (src_path, dest_path) pages built or
+    # kept as current, which excludes drafts and other shards' pages.
+    all_pages = find_pages(dir_path_content, dest_dir_path)
+    pages = drop_drafts(all_pages)
+    for src_path, _ in sorted(set(all_pages) - set(pages)):
+        print(f"Skipping draft {src_path}")
+    if shard is not None:
+        pages = select_shard(pages, *shard)
+    pending = []
+    for src_path, dest_path in pages:
+        if manifest is None:
+            pending.append((src_path, dest_path, None))
+            continue
+        src_hash = page_hash(src_path, template_path)
+        if manifest.is_current(src_path, dest_path, src_hash):
+            manifest.record(src_path, dest_path, src_hash)
+        else:
+            pending.append((src_path, dest_path, src_hash))
+
+    if jobs <= 1 or len(pending) <= 1:
+        with OutputWriter(workers=max(writers, 1)) as writer:
+            for src_path, dest_path, src_hash in pending:
+                meta = generate_page(src_path, template_path, dest_path, basepath, writer, assets, large_file_size)
+                if manifest is not None:
+                    manifest.record(src_path, dest_path, src_hash, meta)
+        return pages
+
+    errors = []
+    profiler = profiling.active()
+    index = search.active()
+    graph = linkgraph.active()
+    cache = blockcache.active()
+    search_records = []
+    cache_size = cache.maxsize if cache is not None else 0
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(assets, cache_size)) as executor:
+        futures = {
+            executor.submit(
+                _generate_page_job, src_path, template_path, dest_path, basepath, profiler is not None,
+                index is not None, graph is not None, large_file_size,
+            ): (dest_path, src_hash)
+            for src_path, dest_path, src_hash in pending
+        }
+        for future in as_completed(futures):
+            src_path, log, error, profile_data, records, link_records, meta, blocks = future.result()
+            print(log, end="")
+            for key, entry in blocks or ():
+                cache.put(key, entry)
+            if profile_data is not None:
+                profiler.merge(profile_data)
+            search_records.extend(records or ())
+            for record in link_records or ():
+                graph.add_page(*record)
+            if error is not None:
+                errors.append(f"{src_path}: {error}")
+            elif manifest is not None:
+                dest_path, src_hash = futures[future]
+                manifest.record(src_path, dest_path, src_hash, meta)
+
+    # Index in path order so new pages get the same ids whatever order workers finish in
+    for record in sorted(search_records):
+        index.add_page(*record)
+    if errors:
+        raise ValueError(f"{len(errors)} page(s) failed to generate:\n" + "\n".join(errors))
+    return pages
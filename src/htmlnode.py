@@ -2,7 +2,13 @@
 
 
 
+import io
+
+
 class HTMLNode:
+    # Pages create huge numbers of nodes; slots keep each one small
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
         self.value = value
@@ -10,6 +16,12 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        out = io.StringIO()
+        self.write_html(out)
+        return out.getvalue()
+
+    def write_html(self, out):
+        # Write this node's HTML to `out` (anything with a write() method)
         raise NotImplementedError
     
     def props_to_html(self):
@@ -0,0 +1,178 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from functions import sync_file
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+DEFAULT_WIDTHS = (480, 960, 1600)
+CACHE_DIR = ".image-cache"
+JPEG_QUALITY = 82
+
+# Bump when variant encoding changes so cached derivatives are regenerated
+CACHE_VERSION = 1
+
+
+def variant_path(rel_path, digest, width):
+    """Return the published name of a `width`-pixel variant: images/tom.3f9a1c2b-480w.png."""
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:8]}-{width}w{ext}"
+
+
+def sizes_attr(width):
+    """Default `sizes`: full viewport width, capped at the image's own width."""
+    return f"(max-width: {width}px) 100vw, {width}px"
+
+
+def _cache_file(cache_dir, digest, width, ext):
+    return os.path.join(cache_dir, f"{digest}-{width}w{ext}")
+
+
+def _load_pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ValueError("Responsive images need Pillow: pip install Pillow") from None
+    return Image
+
+
+def _make_variants(src_path, digest, cache_dir, widths):
+    # Runs in a worker process: resize and recompress one source image into
+    # every requested width narrower than the original
+    Image = _load_pillow()
+    ext = os.path.splitext(src_path)[1].lower()
+    made = []
+    with Image.open(src_path) as image:
+        width, height = image.size
+        for target in widths:
+            if target >= width:
+                continue
+            resized = image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+            if ext in (".jpg", ".jpeg"):
+                options = {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}
+                resized = resized.convert("RGB")
+            elif ext == ".webp":
+                options = {"quality": JPEG_QUALITY}
+            else:
+                options = {"optimize": True}
+            path = _cache_file(cache_dir, digest, target, ext)
+            tmp = f"{path}.tmp-{os.getpid()}"
+            resized.save(tmp, format=image.format, **options)
+            os.replace(tmp, path)
+            made.append(target)
+    return digest, width, height, made
+
+
+class ImageCache:
+    """Derivatives of static images, keyed by the source's sha256.
+
+    The index maps a digest to the original's size and the widths generated
+    for it; the variant files live alongside it in `cache_dir`. An image is
+    only resized again when its content changes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, widths=DEFAULT_WIDTHS):
+        self.cache_dir = cache_dir
+        self.widths = tuple(sorted(widths))
+        self.entries = {}
+        self.generated = 0
+
+    @property
+    def index_path(self):
+        return os.path.join(self.cache_dir, "index.json")
+
+    def load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION and tuple(data.get("widths", ())) == self.widths:
+            self.entries = data.get("images", {})
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = {"version": CACHE_VERSION, "widths": list(self.widths), "images": self.entries}
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    def _is_current(self, digest, ext):
+        entry = self.entries.get(digest)
+        if entry is None:
+            return False
+        return all(os.path.exists(_cache_file(self.cache_dir, digest, w, ext)) for w in entry["variants"])
+
+    def update(self, sources, jobs=None):
+        """Generate variants for `sources`, a list of (path, digest), that are not cached yet.
+
+        Missing images are resized in a process pool of `jobs` workers.
+        """
+        missing = {}
+        for path, digest in sources:
+            if not self._is_current(digest, os.path.splitext(path)[1].lower()):
+                missing.setdefault(digest, path)
+        if not missing:
+            return
+        _load_pillow()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(_make_variants, path, digest, self.cache_dir, self.widths)
+                for digest, path in missing.items()
+            ]
+            for future in futures:
+                digest, width, height, made = future.result()
+                self.entries[digest] = {"width": width, "height": height, "variants": made}
+                self.generated += 1
+
+
+def responsive_images(static_dir, stamps, cache, jobs=None):
+    """Make sure every image under `static_dir` has cached variants.
+
+    `stamps` is AssetManifest.stamps, {rel_path: [size, mtime_ns, sha256]},
+    so no image is hashed twice. Returns (images, outputs): `images` maps
+    each image's root-relative URL to {"width", "height", "srcset",
+    "sizes"}, where srcset lists [url, width] pairs ending with the
+    original; `outputs` maps the relative path each variant is published
+    under to its cache file.
+    """
+    sources = []
+    for rel_path, stamp in sorted(stamps.items()):
+        if os.path.splitext(rel_path)[1].lower() in IMAGE_EXTENSIONS:
+            sources.append((rel_path, os.path.join(static_dir, rel_path), stamp[2]))
+    cache.update([(path, digest) for _, path, digest in sources], jobs)
+
+    images = {}
+    outputs = {}
+    for rel_path, _, digest in sources:
+        entry = cache.entries[digest]
+        ext = os.path.splitext(rel_path)[1].lower()
+        url = "/" + rel_path.replace(os.sep, "/")
+        srcset = []
+        for width in entry["variants"]:
+            published = variant_path(rel_path, digest, width)
+            outputs[published] = _cache_file(cache.cache_dir, digest, width, ext)
+            srcset.append(["/" + published.replace(os.sep, "/"), width])
+        srcset.append([url, entry["width"]])
+        images[url] = {
+            "width": entry["width"],
+            "height": entry["height"],
+            "srcset": srcset,
+            "sizes": sizes_attr(entry["width"]),
+        }
+    return images, outputs
+
+
+def place_images(outputs, dest_dir, previous=None, link="copy"):
+    """Publish cached variants into `dest_dir` and delete ones no longer produced.
+
+    `previous` is the return value of the last call. Returns the sorted
+    relative paths placed.
+    """
+    for rel_path, cache_path in outputs.items():
+        sync_file(cache_path, os.path.join(dest_dir, rel_path), link=link)
+    for rel_path in previous or ():
+        stale = os.path.join(dest_dir, rel_path)
+        if rel_path not in outputs and os.path.isfile(stale):
+            os.remove(stale)
+    return sorted(outputs)
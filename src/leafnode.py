@@ -2,12 +2,11 @@ from htmlnode import HTMLNode
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None):
+        # Leaf nodes do not have children
         super().__init__(tag=tag, value=value, props=props)
-        self.tag = tag
-        self.value = value
-        self.props = props
-        self.children = None  # Leaf nodes do not have children
 
     def to_html(self):
         # Handle self-closing tags (like img) that don't need a value
@@ -19,3 +18,6 @@ class LeafNode(HTMLNode):
         if self.tag is None:
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+    def write_html(self, out):
+        out.write(self.to_html())
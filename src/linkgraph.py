@@ -0,0 +1,135 @@
+import json
+import os
+
+from collector import Collector
+from textnode import TextType
+
+GRAPH_PATH = ".link-graph.json"
+GRAPH_VERSION = 1
+
+# Reports pages to the active LinkGraph and gathers the URLs they link to
+_collector = Collector()
+enable = _collector.enable
+disable = _collector.disable
+active = _collector.active
+collecting = _collector.collecting
+
+
+def normalize_url(url):
+    """Return the site path an internal link points at, or None for other links.
+
+    Query strings, fragments and trailing slashes are dropped, so
+    "/blog/tom/#intro" and "/blog/tom" are the same target.
+    """
+    if not url.startswith("/") or url.startswith("//"):
+        return None
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    return path.rstrip("/") or "/"
+
+
+def add_text_nodes(text_nodes):
+    """Add the URLs of link nodes in `text_nodes` to the links being collected."""
+    _collector.add(node.url for node in text_nodes if node.text_type == TextType.LINK)
+
+
+def add_links(urls):
+    _collector.add(urls)
+
+
+class LinkGraph:
+    """Page-to-page link graph, saved between builds.
+
+    `pages` maps each source path to its site path and the internal paths
+    it links to; `incoming` is the reverse index, so finding the pages that
+    link to a target costs only the number of such links.
+    """
+
+    def __init__(self, path, dest_dir, pages=None):
+        self.path = path
+        self.dest_dir = dest_dir
+        self.pages = pages if pages is not None else {}
+        self.loaded = pages is not None
+        self.incoming = {}
+        for src_path, page in self.pages.items():
+            self._link(src_path, page["links"])
+
+    @classmethod
+    def load(cls, path, dest_dir):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, dest_dir)
+        if data.get("version") != GRAPH_VERSION:
+            return cls(path, dest_dir)
+        return cls(path, dest_dir, data["pages"])
+
+    def page_url(self, dest_path):
+        rel_path = os.path.relpath(dest_path, self.dest_dir)
+        if rel_path == ".":
+            return "/"
+        return "/" + rel_path.replace(os.sep, "/")
+
+    def _link(self, src_path, targets):
+        for target in targets:
+            self.incoming.setdefault(target, set()).add(src_path)
+
+    def _unlink(self, src_path, targets):
+        for target in targets:
+            sources = self.incoming.get(target)
+            if sources is not None:
+                sources.discard(src_path)
+                if not sources:
+                    del self.incoming[target]
+
+    def add_page(self, src_path, dest_path, urls):
+        targets = sorted({target for target in map(normalize_url, urls) if target is not None})
+        self.remove_page(src_path)
+        self.pages[src_path] = {"url": self.page_url(dest_path), "links": targets}
+        self._link(src_path, targets)
+
+    def remove_page(self, src_path):
+        old = self.pages.pop(src_path, None)
+        if old is not None:
+            self._unlink(src_path, old["links"])
+
+    def prune(self, known_pages):
+        """Drop every page not in `known_pages` (e.g. BuildManifest.pages)."""
+        for src_path in [src_path for src_path in self.pages if src_path not in known_pages]:
+            self.remove_page(src_path)
+
+    def linking_to(self, urls):
+        """Return the source paths of pages linking to any of `urls`."""
+        sources = set()
+        for url in urls:
+            sources.update(self.incoming.get(url, ()))
+        return sources
+
+    def stale_pages(self, pages):
+        """Return pages linking to a site path that appeared or disappeared.
+
+        `pages` is the (src_path, dest_path) list of the coming build, as
+        returned by find_pages(); comparing its paths with the recorded ones
+        finds pages that were moved, deleted or added since the last build.
+        """
+        old_urls = {page["url"] for page in self.pages.values()}
+        new_urls = {self.page_url(dest_path) for _, dest_path in pages}
+        return self.linking_to(old_urls ^ new_urls)
+
+    def dangling(self, known_urls=()):
+        """Return sorted (src_path, target) pairs for internal links to no page.
+
+        `known_urls` holds other valid site paths, such as static files.
+        """
+        page_urls = {page["url"] for page in self.pages.values()}
+        return sorted(
+            (src_path, target)
+            for target, sources in self.incoming.items()
+            if target not in page_urls and target not in known_urls
+            for src_path in sources
+        )
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": GRAPH_VERSION, "pages": self.pages}, f, indent=2, sort_keys=True)
+        self.loaded = True
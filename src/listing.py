@@ -0,0 +1,166 @@
+import os
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+from functions import rewrite_links
+from leafnode import LeafNode
+from parentnode import ParentNode
+from template import load_template
+from writer import write_output
+
+PAGE_SIZE = 10
+FEED_SIZE = 20
+FEED_NAME = "feed.xml"
+
+
+def section_entries(manifest, content_dir, section, dest_dir):
+    """Return the pages under `content_dir`/`section`, newest first.
+
+    Entries come from the metadata the build manifest keeps for every page,
+    so no markdown is read. The section's own index.md is not listed.
+    Pages are dated by their front-matter `date`, else their mtime.
+    """
+    section_dir = os.path.normpath(os.path.join(content_dir, section))
+    section_index = os.path.join(section_dir, "index.md")
+    entries = []
+    for src_path, entry in manifest.pages.items():
+        meta = entry.get("meta")
+        src_path = os.path.normpath(src_path)
+        if meta is None or src_path == section_index:
+            continue
+        if os.path.commonpath([src_path, section_dir]) != section_dir:
+            continue
+        url = "/" + os.path.relpath(entry["dest"], dest_dir).replace(os.sep, "/")
+        entries.append({"url": url, **meta, "time": _entry_time(meta)})
+    entries.sort(key=lambda entry: (-entry["time"], entry["url"]))
+    return entries
+
+
+def _entry_time(meta):
+    if not meta.get("date"):
+        return meta["mtime"]
+    date = datetime.fromisoformat(meta["date"])
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+
+def listing_url(section, number):
+    """Return the site path of page `number` (1-based) of a section's listing."""
+    if number == 1:
+        return f"/{section}"
+    return f"/{section}/page/{number}"
+
+
+def listing_urls(section, count):
+    """Return the site paths of a section's `count` listing pages and its feed."""
+    return [listing_url(section, number) for number in range(1, count + 1)] + [f"/{section}/{FEED_NAME}"]
+
+
+def _timestamp(mtime):
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _listing_nodes(title, entries, section, number, count):
+    items = []
+    for entry in entries:
+        items.append(ParentNode("li", [
+            ParentNode("a", [LeafNode(value=entry["title"])], {"href": entry["url"]}),
+            LeafNode("time", _timestamp(entry["time"])[:10], {"datetime": _timestamp(entry["time"])}),
+            LeafNode(value=entry["summary"]),
+        ]))
+    nodes = [LeafNode("h1", title)]
+    if items:
+        nodes.append(ParentNode("ul", items, {"class": "listing"}))
+    links = []
+    if number > 1:
+        links.append(LeafNode("a", "Newer posts", {"href": listing_url(section, number - 1), "rel": "prev"}))
+    if number < count:
+        links.append(LeafNode("a", "Older posts", {"href": listing_url(section, number + 1), "rel": "next"}))
+    if links:
+        nodes.append(ParentNode("nav", links))
+    return nodes
+
+
+def write_listing(entries, section, dest_dir, template_path, basepath="/", assets=None, page_size=PAGE_SIZE,
+                  title=None):
+    """Write the paginated listing of `entries` for `section` into `dest_dir`.
+
+    Page 1 is `section`/index.html and page N is `section`/page/N/index.html.
+    Pages left over from a longer listing are removed. Unchanged pages are
+    not rewritten. Returns the number of listing pages.
+    """
+    title = title or section.replace("-", " ").title()
+    template = load_template(template_path, basepath, assets)
+    count = max(1, -(-len(entries) // page_size))
+    known_dirs = set()
+    for number in range(1, count + 1):
+        chunk = entries[(number - 1) * page_size:number * page_size]
+        content = []
+        for node in _listing_nodes(title, chunk, section, number, count):
+            rewrite_links(node, basepath, assets)
+            content.append(node.to_html())
+        html = template.render(Title=title, Content="".join(content))
+        path = os.path.join(dest_dir, listing_url(section, number)[1:], "index.html")
+        write_output(path, html.encode("utf-8"), known_dirs)
+    _remove_pages(section, dest_dir, count + 1)
+    return count
+
+
+def _remove_pages(section, dest_dir, first):
+    number = first
+    while os.path.exists(os.path.join(dest_dir, listing_url(section, number)[1:], "index.html")):
+        page_dir = os.path.join(dest_dir, listing_url(section, number)[1:])
+        os.remove(os.path.join(page_dir, "index.html"))
+        if number > 1:
+            os.rmdir(page_dir)
+        number += 1
+
+
+def remove_listing(section, dest_dir):
+    """Delete the listing pages and feed of a section that is no longer listed."""
+    _remove_pages(section, dest_dir, 1)
+    feed = os.path.join(dest_dir, section, FEED_NAME)
+    if os.path.exists(feed):
+        os.remove(feed)
+    for directory in (os.path.join(dest_dir, section, "page"), os.path.join(dest_dir, section)):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def write_feed(entries, section, dest_dir, basepath="/", site_url="", size=FEED_SIZE, title=None):
+    """Write an Atom feed of the newest `size` entries to `section`/feed.xml.
+
+    Links are absolute when `site_url` (e.g. https://example.com) is given.
+    """
+    title = title or section.replace("-", " ").title()
+    root = site_url.rstrip("/") + basepath
+
+    def absolute(url):
+        return root + url[1:]
+
+    entries = entries[:size]
+    updated = _timestamp(max((entry["time"] for entry in entries), default=0))
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(title)}</title>",
+        f"  <id>{escape(absolute(listing_url(section, 1)))}</id>",
+        f"  <link href={quoteattr(absolute(listing_url(section, 1)))} />",
+        f"  <link rel=\"self\" href={quoteattr(absolute(f'/{section}/{FEED_NAME}'))} />",
+        f"  <updated>{updated}</updated>",
+    ]
+    for entry in entries:
+        lines += [
+            "  <entry>",
+            f"    <title>{escape(entry['title'])}</title>",
+            f"    <link href={quoteattr(absolute(entry['url']))} />",
+            f"    <id>{escape(absolute(entry['url']))}</id>",
+            f"    <updated>{_timestamp(entry['time'])}</updated>",
+            f"    <summary type=\"html\">{escape(entry['summary'])}</summary>",
+            "  </entry>",
+        ]
+    lines.append("</feed>")
+    write_output(os.path.join(dest_dir, section, FEED_NAME), ("\n".join(lines) + "\n").encode("utf-8"))
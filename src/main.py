@@ -1,22 +1,257 @@
+import argparse
+import functools
+import os
 
+import blockcache
+import linkgraph
+import profiling
+import search
+from devserver import ReloadNotifier, SiteWatcher, serve
+from functions import sync_tree
+from functions import drop_drafts, find_pages, generate_pages_recursive, page_hash
+from assets import AssetManifest
+from linkgraph import GRAPH_PATH, LinkGraph
+from listing import PAGE_SIZE, listing_urls, remove_listing, section_entries, write_feed, write_listing
+from compress import MIN_SIZE, compress_tree, parse_formats
+from images import CACHE_DIR, ImageCache, place_images, responsive_images
+from manifest import BuildManifest
+from search import SearchIndex, remove_index
+from shards import merge_shards, parse_shard, write_shard_manifest
 
-import sys
+MANIFEST_PATH = ".build-manifest.json"
+ASSET_MANIFEST_PATH = "docs/asset-manifest.json"
 
-from functions import recursive_copy
-from functions import generate_pages_recursive
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix for site links (default: /)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="render pages in N worker processes (default: 1)")
+    parser.add_argument("--writers", type=int, default=4, metavar="N",
+                        help="background threads writing pages when --jobs is 1 (default: 4)")
+    parser.add_argument("--large-file-size", type=int, default=64, metavar="MB",
+                        help="stream sources of at least MB megabytes block by block to bound memory, "
+                             "0 for every page (default: 64)")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static files by content hash instead of size and mtime")
+    parser.add_argument("--link", choices=("copy", "hardlink", "reflink"), default="copy",
+                        help="how to place changed static files in docs/ (default: copy)")
+    parser.add_argument("--block-cache-size", type=int, default=4096, metavar="N",
+                        help="keep up to N rendered blocks in memory, 0 to disable (default: 4096)")
+    parser.add_argument("--block-cache", metavar="FILE",
+                        help="persist rendered blocks to FILE between builds")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="also publish static files under content-hashed names and link pages to them")
+    parser.add_argument("--responsive-images", action="store_true",
+                        help="publish resized variants of static images and add srcset/sizes to <img> (needs Pillow)")
+    parser.add_argument("--image-cache", default=CACHE_DIR, metavar="DIR",
+                        help=f"directory caching resized images between builds (default: {CACHE_DIR})")
+    parser.add_argument("--listing", action="append", default=[], metavar="SECTION",
+                        help="generate paginated listing pages and an Atom feed for content/SECTION/ (repeatable)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, metavar="N",
+                        help=f"entries per listing page (default: {PAGE_SIZE})")
+    parser.add_argument("--site-url", default="", metavar="URL",
+                        help="absolute site URL for feed links, e.g. https://example.com")
+    parser.add_argument("--check-links", action="store_true",
+                        help="keep a page link graph, report broken internal links and rebuild pages "
+                             "linking to moved or deleted pages")
+    parser.add_argument("--search", action="store_true",
+                        help="publish a sharded full-text search index under docs/search/")
+    parser.add_argument("--compress", metavar="FORMATS",
+                        help="write pre-compressed sidecars for HTML, CSS and text in docs/, e.g. gzip or gzip,br")
+    parser.add_argument("--compress-min-size", type=int, default=MIN_SIZE, metavar="BYTES",
+                        help=f"skip files smaller than BYTES when compressing (default: {MIN_SIZE})")
+    parser.add_argument("--compress-level", type=int, metavar="N",
+                        help="compression level, capped at 9 for gzip (default: 9 for gzip, 11 for br)")
+    parser.add_argument("--shard", metavar="i/N",
+                        help="build only shard i of N into SHARD_DIR/shard-i/ for a later --merge-shards")
+    parser.add_argument("--merge-shards", action="store_true",
+                        help="combine the shard builds in SHARD_DIR into docs/")
+    parser.add_argument("--shard-dir", default="shards/", help="directory holding shard builds (default: shards/)")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, serve docs/ and rebuild changed files with live reload")
+    parser.add_argument("--port", type=int, default=8888, help="port for --watch (default: 8888)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each pipeline stage and page and print a summary")
+    parser.add_argument("--profile-json", metavar="FILE", help="with --profile, also write the timings as JSON")
+    parser.add_argument("--profile-trace", metavar="FILE",
+                        help="with --profile, also write a Chrome trace-event file")
+    return parser.parse_args(argv)
+
+
+def load_assets(manifest, fingerprint, images=False, image_cache=CACHE_DIR, jobs=1):
+    # Hash static/ (reusing hashes of unchanged files), fingerprint it and
+    # resize its images as requested, and mark every page stale when the
+    # resulting mapping differs from the last build's.
+    # Returns (AssetManifest or None, {published path: cached variant}).
+    if not fingerprint and not images:
+        manifest.set_salt("")
+        return None, {}
+    assets = AssetManifest.from_dir("static/", manifest.asset_stamps, fingerprint=fingerprint)
+    manifest.asset_stamps = assets.stamps
+    outputs = {}
+    if images:
+        with profiling.stage("images"):
+            cache = ImageCache(image_cache)
+            cache.load()
+            variants, outputs = responsive_images("static/", assets.stamps, cache, jobs=jobs)
+            cache.save()
+        if cache.generated:
+            print(f"Resized {cache.generated} image(s)")
+        assets.set_images(variants)
+    manifest.set_salt(assets.digest)
+    return assets, outputs
+
+
+def publish_assets(manifest, args):
+    # Sync static/ into docs/ (also under fingerprinted names, with resized
+    # images, as requested) and return the AssetManifest or None
+    assets, image_outputs = load_assets(manifest, args.fingerprint, args.responsive_images,
+                                        args.image_cache, args.jobs)
+    with profiling.stage("sync_assets"):
+        manifest.assets = sync_tree("static/", "docs/", manifest.assets, checksum=args.checksum, link=args.link,
+                                    aliases=assets.files if assets is not None else None)
+        manifest.images = place_images(image_outputs, "docs/", manifest.images, link=args.link)
+    if args.fingerprint:
+        assets.write(ASSET_MANIFEST_PATH)
+    elif os.path.exists(ASSET_MANIFEST_PATH):
+        os.remove(ASSET_MANIFEST_PATH)
+    return assets
 
 
 def main():
-    
-    if len(sys.argv) < 2:
-        basepath = "/"
+    args = parse_args()
+    if (args.shard or args.merge_shards) and (args.search or args.check_links or args.listing):
+        raise ValueError("--search, --check-links and --listing cannot be combined with --shard or --merge-shards")
+    basepath = args.basepath
+    profiler = profiling.enable() if args.profile else None
+    cache = blockcache.enable(args.block_cache_size, args.block_cache) if args.block_cache_size > 0 else None
+    compress_formats = parse_formats(args.compress) if args.compress else ()
+    large_file_size = args.large_file_size * 1024 * 1024
+
+    if args.shard:
+        # Pages only; static assets are synced once by --merge-shards
+        index, count = parse_shard(args.shard)
+        shard_root = os.path.join(args.shard_dir, f"shard-{index}")
+        shard_docs = os.path.join(shard_root, "docs")
+        manifest = BuildManifest.load(os.path.join(shard_root, "build-manifest.json"), "template.html", basepath)
+        assets, _ = load_assets(manifest, args.fingerprint, args.responsive_images, args.image_cache, args.jobs)
+        shard_pages = generate_pages_recursive("content/", "template.html", shard_docs, basepath, manifest,
+                                               jobs=args.jobs, writers=args.writers, shard=(index, count),
+                                               assets=assets, large_file_size=large_file_size)
+        manifest.prune()
+        manifest.save()
+        all_pages = drop_drafts(find_pages("content/", shard_docs))
+        write_shard_manifest(shard_root, index, count, all_pages, shard_pages, shard_docs)
     else:
-        basepath = sys.argv[1]
+        manifest = BuildManifest.load(MANIFEST_PATH, "template.html", basepath)
+        assets = publish_assets(manifest, args)
+        if args.merge_shards:
+            merged = merge_shards(args.shard_dir, "docs/")
+            print(f"Merged {len(merged)} pages from {args.shard_dir}")
+            # Recorded like a normal build, so pages no shard built any more are pruned
+            for src_path, dest_path in merged.items():
+                manifest.record(src_path, dest_path, page_hash(src_path, "template.html"))
+            for src_path in manifest.prune():
+                print(f"Removed output for deleted page {src_path}")
+        else:
+            index = None
+            if args.search:
+                index = search.enable(SearchIndex.load("docs/", basepath=basepath))
+                if not index.loaded:
+                    # Unchanged pages are skipped, so index everything once
+                    manifest.invalidate_all()
+            else:
+                remove_index("docs/")
+            graph = None
+            if args.check_links:
+                graph = linkgraph.enable(LinkGraph.load(GRAPH_PATH, "docs/"))
+                if not graph.loaded:
+                    manifest.invalidate_all()
+                for src_path in sorted(graph.stale_pages(drop_drafts(find_pages("content/", "docs/")))):
+                    print(f"Rebuilding {src_path}, it links to a moved or deleted page")
+                    manifest.invalidate(src_path)
+            elif os.path.exists(GRAPH_PATH):
+                os.remove(GRAPH_PATH)
+            for section in args.listing:
+                if os.path.exists(os.path.join("content", section, "index.md")):
+                    raise ValueError(f"content/{section}/index.md would be replaced by the --listing page")
+            # Before generating pages, as a section's own index.md may now
+            # take the place of its listing
+            for section in set(manifest.listings or ()) - set(args.listing):
+                remove_listing(section, "docs/")
+            if args.listing:
+                # Pages recorded before metadata was kept must be generated once more
+                for src_path, entry in list(manifest.pages.items()):
+                    if "meta" not in entry:
+                        manifest.invalidate(src_path)
+            generate_pages_recursive("content/", "template.html", "docs/", basepath, manifest,
+                                     jobs=args.jobs, writers=args.writers, assets=assets,
+                                     large_file_size=large_file_size)
+            for src_path in manifest.prune():
+                print(f"Removed output for deleted page {src_path}")
+            listed_urls = set()
+            for section in args.listing:
+                with profiling.stage("listing"):
+                    entries = section_entries(manifest, "content/", section, "docs/")
+                    count = write_listing(entries, section, "docs/", "template.html", basepath, assets, args.page_size)
+                    write_feed(entries, section, "docs/", basepath, args.site_url)
+                print(f"Listed {len(entries)} page(s) of {section} on {count} page(s)")
+                listed_urls.update(listing_urls(section, count))
+            manifest.listings = sorted(set(args.listing))
+            if index is not None:
+                with profiling.stage("search_index"):
+                    index.prune(manifest.pages)
+                    index.save()
+            if graph is not None:
+                graph.prune(manifest.pages)
+                graph.save()
+                static_urls = {"/" + rel_path.replace(os.sep, "/")
+                               for rel_path in (manifest.assets or []) + (manifest.images or [])}
+                broken = graph.dangling(static_urls | listed_urls)
+                for src_path, target in broken:
+                    print(f"Broken link in {src_path}: {target}")
+                if broken:
+                    print(f"Found {len(broken)} broken internal link(s)")
+        if compress_formats or manifest.sidecars:
+            # Also runs once with no formats after --compress is dropped, so
+            # no outdated sidecar is left behind
+            with profiling.stage("compress"):
+                # Sidecars written at another level are rewritten, not just stale ones
+                written, checked = compress_tree("docs/", compress_formats, args.compress_level,
+                                                 args.compress_min_size,
+                                                 force=args.compress_level != manifest.compress_level)
+            if compress_formats:
+                print(f"Compressed {written} sidecar(s) for {checked} file(s)")
+            manifest.sidecars = list(compress_formats)
+            manifest.compress_level = args.compress_level
+        manifest.save()
+    if cache is not None:
+        cache.save()
 
-    
+    if profiler is not None:
+        print(profiler.summary())
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+        if args.profile_trace:
+            profiler.write_trace(args.profile_trace)
 
-    recursive_copy("static/", "docs/")
-    generate_pages_recursive("content/", "template.html", "docs/", basepath)
+    if args.watch:
+        profiling.disable()
+        notifier = ReloadNotifier()
+        serve("docs/", args.port, notifier)
+        print(f"Serving docs/ at http://localhost:{args.port}/ and watching for changes (Ctrl-C to stop)")
+        # Static changes are published like a build would when names depend on content
+        republish = None
+        if args.fingerprint or args.responsive_images:
+            republish = functools.partial(publish_assets, args=args)
+        watcher = SiteWatcher("content/", "static/", "template.html", "docs/", basepath, manifest, link=args.link,
+                              assets=assets, publish_assets=republish, large_file_size=large_file_size)
+        try:
+            watcher.watch(notifier)
+        except KeyboardInterrupt:
+            pass
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+
+
+def hash_file(path):
+    """Return the sha256 hex digest of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Persistent record of the inputs each generated page was built from.
+
+    A page is skipped when its source hash is unchanged and its output still
+    exists. The template hash and basepath are shared by every page, so a
+    change to either marks all recorded pages stale and forces a full
+    rebuild. Stale pages keep their output directory, so prune() still
+    removes the output of sources deleted in the same build.
+
+    set_salt() does the same for any other input shared by every page, such
+    as the asset manifest digest.
+
+    `assets` holds the static files copied by the last sync_tree() call and
+    `asset_stamps` the fingerprint hashes of the last AssetManifest, and
+    `images` the responsive image variants last published, `sidecars` the
+    compression formats last written, `compress_level` the level they were
+    written at and `listings` the sections last listed; all are kept
+    regardless of template changes.
+    """
+
+    def __init__(self, path, template_hash, basepath, pages=None, assets=None, asset_stamps=None, salt="",
+                 images=None, sidecars=None, listings=None, compress_level=None):
+        self.path = path
+        self.template_hash = template_hash
+        self.basepath = basepath
+        self.pages = pages if pages is not None else {}
+        self.assets = assets
+        self.asset_stamps = asset_stamps
+        self.salt = salt
+        self.images = images
+        self.sidecars = sidecars
+        self.listings = listings
+        self.compress_level = compress_level
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path, template_path, basepath="/"):
+        template_hash = hash_file(template_path)
+        data = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        manifest = cls(path, template_hash, basepath, data.get("pages", {}), data.get("assets"),
+                       data.get("asset_stamps"), data.get("salt", ""), data.get("images"), data.get("sidecars"),
+                       data.get("listings"), data.get("compress_level"))
+        if data.get("template") != template_hash or data.get("basepath") != basepath:
+            manifest.invalidate_all()
+        return manifest
+
+    def set_salt(self, salt):
+        """Mark every page stale if `salt` differs from the last build's."""
+        if salt != self.salt:
+            self.invalidate_all()
+        self.salt = salt
+
+    def is_current(self, src_path, dest_path, src_hash):
+        entry = self.pages.get(src_path)
+        if entry is None:
+            return False
+        if entry["hash"] != src_hash or entry["dest"] != dest_path:
+            return False
+        return os.path.exists(os.path.join(dest_path, "index.html"))
+
+    def record(self, src_path, dest_path, src_hash, meta=None):
+        """Record a generated or skipped page.
+
+        `meta` is the page's listing metadata; a page skipped as current
+        keeps the metadata recorded when it was generated.
+        """
+        old = self.pages.get(src_path)
+        entry = {"hash": src_hash, "dest": dest_path}
+        if meta is None and old is not None and old["hash"] == src_hash:
+            meta = old.get("meta")
+        if meta is not None:
+            entry["meta"] = meta
+        self.pages[src_path] = entry
+        self.seen.add(src_path)
+
+    def invalidate(self, src_path):
+        """Force `src_path` to be regenerated by the next build."""
+        entry = self.pages.get(src_path)
+        if entry is not None:
+            entry["hash"] = None
+
+    def invalidate_all(self):
+        """Force every page to be regenerated, keeping their outputs known to prune()."""
+        for entry in self.pages.values():
+            entry["hash"] = None
+
+    def remove(self, src_path):
+        """Forget `src_path` and delete its generated output."""
+        entry = self.pages.pop(src_path, None)
+        self.seen.discard(src_path)
+        if entry is None:
+            return
+        dest_path = entry["dest"]
+        output_file = os.path.join(dest_path, "index.html")
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        # Only drop the directory itself once it is empty, never its parents
+        try:
+            os.rmdir(dest_path)
+        except OSError:
+            pass
+
+    def prune(self):
+        """Remove output for pages whose source was not seen in this build.
+
+        Returns the list of removed source paths.
+        """
+        removed = [src_path for src_path in self.pages if src_path not in self.seen]
+        for src_path in removed:
+            self.remove(src_path)
+        return removed
+
+    def save(self):
+        data = {
+            "template": self.template_hash,
+            "basepath": self.basepath,
+            "pages": self.pages,
+            "assets": self.assets,
+            "asset_stamps": self.asset_stamps,
+            "salt": self.salt,
+            "images": self.images,
+            "sidecars": self.sidecars,
+            "listings": self.listings,
+            "compress_level": self.compress_level,
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
@@ -0,0 +1,123 @@
+import contextlib
+import json
+import os
+import time
+
+# The active Profiler, or None when profiling is off. Instrumented code calls
+# the module-level stage()/page() helpers, which cost a single check when off.
+_profiler = None
+_NULL = contextlib.nullcontext()
+
+
+class Profiler:
+    """Records wall time and call counts per pipeline stage and per page."""
+
+    def __init__(self):
+        self.stages = {}  # name -> [calls, seconds]
+        self.pages = {}  # path -> seconds
+        self.events = []  # (name, page, start_ns, duration_ns, pid)
+        self.current_page = None
+
+    def _record(self, name, start, end):
+        entry = self.stages.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += (end - start) / 1e9
+        self.events.append((name, self.current_page, start, end - start, os.getpid()))
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter_ns())
+
+    @contextlib.contextmanager
+    def page(self, path):
+        previous, self.current_page = self.current_page, path
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self.pages[path] = self.pages.get(path, 0.0) + (end - start) / 1e9
+            self._record("page", start, end)
+            self.current_page = previous
+
+    def export(self):
+        return {
+            "stages": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in self.stages.items()},
+            "pages": dict(self.pages),
+            "events": [list(event) for event in self.events],
+        }
+
+    def merge(self, data):
+        """Fold in the export() of a profiler that ran in another process."""
+        for name, stats in data["stages"].items():
+            entry = self.stages.setdefault(name, [0, 0.0])
+            entry[0] += stats["calls"]
+            entry[1] += stats["seconds"]
+        for path, seconds in data["pages"].items():
+            self.pages[path] = self.pages.get(path, 0.0) + seconds
+        self.events.extend(tuple(event) for event in data["events"])
+
+    def summary(self, top=10):
+        lines = ["Hottest stages (stages nest, so times are inclusive):"]
+        for name, (calls, seconds) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {name:<16} {seconds * 1000:10.2f} ms  {calls:8d} calls")
+        lines.append(f"Slowest pages (top {top}):")
+        for path, seconds in sorted(self.pages.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"  {seconds * 1000:10.2f} ms  {path}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        data = self.export()
+        del data["events"]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    def write_trace(self, path):
+        """Write the recorded events in Chrome trace-event format."""
+        origin = min((event[2] for event in self.events), default=0)
+        trace = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": pid,
+                "args": {"page": page} if page else {},
+            }
+            for name, page, start, duration, pid in self.events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace}, f)
+
+
+def enable():
+    """Start a fresh Profiler and make it the active one."""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable():
+    global _profiler
+    _profiler = None
+
+
+def active():
+    return _profiler
+
+
+def stage(name):
+    if _profiler is None:
+        return _NULL
+    return _profiler.stage(name)
+
+
+def page(path):
+    if _profiler is None:
+        return _NULL
+    return _profiler.page(path)
@@ -0,0 +1,190 @@
+import json
+import os
+import re
+from collections import Counter
+
+from collector import Collector
+from textnode import TextType
+from writer import write_output
+
+SEARCH_DIR = "search"
+STATE_PATH = ".search-index.json"
+PREFIX_LENGTH = 2
+INDEX_VERSION = 1
+
+# Text node types whose text is indexed; code, links and images are not
+SEARCHABLE_TYPES = (TextType.PLAIN, TextType.BOLD, TextType.ITALIC)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Reports pages to the active SearchIndex and gathers their searchable text
+_collector = Collector()
+enable = _collector.enable
+disable = _collector.disable
+active = _collector.active
+collecting = _collector.collecting
+
+
+def tokenize(text):
+    """Split `text` into lowercase word terms, dropping single characters."""
+    return [term for term in _TOKEN_RE.findall(text.lower()) if len(term) > 1]
+
+
+def shard_prefix(term):
+    return term[:PREFIX_LENGTH]
+
+
+def add_text_nodes(text_nodes):
+    """Add the searchable text of `text_nodes` to the text being collected."""
+    _collector.add(node.text for node in text_nodes if node.text_type in SEARCHABLE_TYPES)
+
+
+def add_text(text):
+    if text:
+        _collector.add((text,))
+
+
+class SearchIndex:
+    """Inverted index over page titles and text, sharded by term prefix.
+
+    It is published under `dest_dir`/search/. pages.json maps document ids
+    to [url, title], and each <prefix>.json maps the terms starting with
+    that prefix to [[doc_id, count], ...] postings, so a browser only
+    fetches the shards its query terms fall in.
+
+    Per-page term counts are kept in `state_path`. Only pages passed to
+    add_page() or removed by prune() are re-indexed, and only the shards
+    whose terms they touch are rewritten by save().
+    """
+
+    def __init__(self, dest_dir, state_path=STATE_PATH, basepath="/", pages=None, next_id=0):
+        self.dest_dir = dest_dir
+        self.state_path = state_path
+        self.basepath = basepath
+        self.pages = pages if pages is not None else {}
+        self.next_id = next_id
+        self.loaded = pages is not None
+        self.dirty = set()
+        self.pages_changed = False
+
+    @classmethod
+    def load(cls, dest_dir, state_path=STATE_PATH, basepath="/"):
+        """Load the saved state, or start empty if it is missing, outdated or unpublished."""
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if (
+            data.get("version") != INDEX_VERSION
+            or data.get("basepath") != basepath
+            or not os.path.exists(os.path.join(dest_dir, SEARCH_DIR, "pages.json"))
+        ):
+            return cls(dest_dir, state_path, basepath)
+        return cls(dest_dir, state_path, basepath, data["pages"], data["next_id"])
+
+    def page_url(self, dest_path):
+        rel_path = os.path.relpath(dest_path, self.dest_dir)
+        if rel_path == ".":
+            return self.basepath
+        return self.basepath + rel_path.replace(os.sep, "/") + "/"
+
+    def add_page(self, src_path, dest_path, title, text, terms=None):
+        # `terms` is a Counter of the text's terms, for callers that count
+        # them as they go instead of passing the whole `text`
+        counts = Counter(tokenize(title))
+        counts.update(tokenize(text))
+        counts.update(terms or {})
+        terms = counts
+        old = self.pages.get(src_path)
+        if old is not None:
+            if old["title"] == title and old["terms"] == terms:
+                return
+            # Only shards holding a term whose count changed need rewriting
+            changed = set(old["terms"].items()) ^ set(terms.items())
+            self.dirty.update(shard_prefix(term) for term, _ in changed)
+            doc_id = old["id"]
+        else:
+            doc_id = self.next_id
+            self.next_id += 1
+            self.dirty.update(shard_prefix(term) for term in terms)
+        self.pages[src_path] = {"id": doc_id, "url": self.page_url(dest_path), "title": title, "terms": dict(terms)}
+        self.pages_changed = True
+
+    def remove_page(self, src_path):
+        old = self.pages.pop(src_path, None)
+        if old is not None:
+            self.dirty.update(shard_prefix(term) for term in old["terms"])
+            self.pages_changed = True
+
+    def prune(self, known_pages):
+        """Drop every indexed page not in `known_pages` (e.g. BuildManifest.pages)."""
+        for src_path in [src_path for src_path in self.pages if src_path not in known_pages]:
+            self.remove_page(src_path)
+
+    def save(self):
+        """Rewrite the changed shards and pages.json, then the state file."""
+        search_dir = os.path.join(self.dest_dir, SEARCH_DIR)
+        known_dirs = set()
+        if self.dirty:
+            postings = {prefix: {} for prefix in self.dirty}
+            for page in self.pages.values():
+                for term, count in page["terms"].items():
+                    shard = postings.get(shard_prefix(term))
+                    if shard is not None:
+                        shard.setdefault(term, []).append([page["id"], count])
+            for prefix, shard in postings.items():
+                path = os.path.join(search_dir, f"{prefix}.json")
+                if shard:
+                    for entries in shard.values():
+                        entries.sort()
+                    data = json.dumps(shard, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+                    write_output(path, data.encode("utf-8"), known_dirs)
+                elif os.path.exists(path):
+                    os.remove(path)
+        if self.pages_changed or not self.loaded:
+            data = {
+                "prefix_length": PREFIX_LENGTH,
+                "pages": {page["id"]: [page["url"], page["title"]] for page in self.pages.values()},
+            }
+            encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+            write_output(os.path.join(search_dir, "pages.json"), encoded.encode("utf-8"), known_dirs)
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "basepath": self.basepath,
+                "next_id": self.next_id,
+                "pages": self.pages,
+            }, f, sort_keys=True)
+        self.dirty = set()
+        self.pages_changed = False
+        self.loaded = True
+
+
+def remove_index(dest_dir, state_path=STATE_PATH):
+    """Delete a published index and its state, e.g. once search is turned off.
+
+    Only pages.json and the shard files are removed, so pages generated
+    under search/ are left alone. Shards are found from the state file, or
+    by their <prefix>.json names if it is gone.
+    """
+    search_dir = os.path.join(dest_dir, SEARCH_DIR)
+    if not os.path.exists(os.path.join(search_dir, "pages.json")):
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        names = {f"{shard_prefix(term)}.json" for page in pages.values() for term in page["terms"]}
+    except (OSError, ValueError, KeyError):
+        names = {name for name in os.listdir(search_dir)
+                 if name.endswith(".json") and len(name) == PREFIX_LENGTH + len(".json")}
+    for name in names | {"pages.json"}:
+        path = os.path.join(search_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+    if not os.listdir(search_dir):
+        os.rmdir(search_dir)
+    if os.path.exists(state_path):
+        os.remove(state_path)
@@ -0,0 +1,101 @@
+import glob
+import heapq
+import json
+import os
+
+from writer import write_output
+
+SHARD_MANIFEST = "shard.json"
+
+
+def parse_shard(spec):
+    """Parse an "i/N" shard spec (1-based) into (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard spec {spec!r}, expected i/N") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard spec {spec!r}, need 1 <= i <= N")
+    return index, count
+
+
+def assign_shards(pages, count):
+    """Split (src_path, dest_path) pages into `count` lists of similar total size.
+
+    Largest pages are placed first, each onto the currently lightest shard.
+    Ties are broken by path and shard number, so every runner computes the
+    same split from the same content tree.
+    """
+    sizes = {src_path: os.path.getsize(src_path) for src_path, _ in pages}
+    weighted = sorted(pages, key=lambda page: (-sizes[page[0]], page[0]))
+    shards = [[] for _ in range(count)]
+    loads = [(0, i) for i in range(count)]
+    for page in weighted:
+        load, i = heapq.heappop(loads)
+        shards[i].append(page)
+        heapq.heappush(loads, (load + sizes[page[0]], i))
+    return shards
+
+
+def select_shard(pages, index, count):
+    """Return the pages that belong to shard `index` of `count`."""
+    return assign_shards(pages, count)[index - 1]
+
+
+def write_shard_manifest(shard_root, index, count, all_pages, shard_pages, dest_dir):
+    """Record which pages shard `index` built, with outputs relative to `dest_dir`."""
+    data = {
+        "shard": index,
+        "count": count,
+        "expected": sorted(src_path for src_path, _ in all_pages),
+        "pages": {src_path: os.path.relpath(dest_path, dest_dir) for src_path, dest_path in shard_pages},
+    }
+    with open(os.path.join(shard_root, SHARD_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def merge_shards(shards_dir, dest_dir):
+    """Combine the shard trees under `shards_dir` into `dest_dir`.
+
+    Each shard directory holds a shard.json and a docs/ tree. The merge is
+    refused with a ValueError if a shard is missing, or if any page was
+    built by no shard or by more than one. Returns {src_path: dest_path}
+    for the merged pages, with outputs under `dest_dir`.
+    """
+    manifests = []
+    for path in sorted(glob.glob(os.path.join(shards_dir, "*", SHARD_MANIFEST))):
+        with open(path, "r", encoding="utf-8") as f:
+            manifests.append((os.path.dirname(path), json.load(f)))
+    if not manifests:
+        raise ValueError(f"No shard manifests found under {shards_dir}")
+
+    problems = []
+    count = manifests[0][1]["count"]
+    expected = set(manifests[0][1]["expected"])
+    indices = sorted(data["shard"] for _, data in manifests)
+    if indices != list(range(1, count + 1)):
+        problems.append(f"expected shards 1..{count}, found {indices}")
+    owners = {}
+    for shard_root, data in manifests:
+        if data["count"] != count or set(data["expected"]) != expected:
+            problems.append(f"shard {data['shard']} was built from a different page set")
+        for src_path in data["pages"]:
+            owners.setdefault(src_path, []).append(data["shard"])
+    for src_path, shard_ids in sorted(owners.items()):
+        if len(shard_ids) > 1:
+            problems.append(f"duplicate page {src_path} in shards {shard_ids}")
+    for src_path in sorted(expected - set(owners)):
+        problems.append(f"missing page {src_path}")
+    if problems:
+        raise ValueError("Cannot merge shards:\n" + "\n".join(problems))
+
+    known_dirs = set()
+    merged = {}
+    for shard_root, data in manifests:
+        for src_path, rel_dest in data["pages"].items():
+            src = os.path.join(shard_root, "docs", rel_dest, "index.html")
+            dest_path = dest_dir if rel_dest == "." else os.path.join(dest_dir, rel_dest)
+            with open(src, "rb") as f:
+                write_output(os.path.join(dest_path, "index.html"), f.read(), known_dirs)
+            merged[src_path] = dest_path
+    return merged
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+
+class SiteTestCase(unittest.TestCase):
+    """Test case building a small site in a temporary directory.
+
+    setUp() creates an empty content/ and a template.html holding TEMPLATE
+    under `root`; `static` and `dest` (docs/) are only named.
+    """
+
+    TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.content)
+        self.write(self.template, self.TEMPLATE)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def read(self, *parts):
+        """Return the text of the file at `parts` under `dest`."""
+        with open(os.path.join(self.dest, *parts), encoding="utf-8") as f:
+            return f.read()
@@ -0,0 +1,83 @@
+import os
+import re
+
+_SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_URL_ATTR_RE = re.compile(r'(href|src)="/([^"]*)"')
+
+# (path, basepath, assets digest) -> (mtime_ns, size, Template)
+_template_cache = {}
+
+
+def apply_basepath(html, basepath, assets=None):
+    """Point root-relative href/src attributes at `basepath`.
+
+    With an AssetManifest, URLs of static files are also swapped for their
+    fingerprinted names.
+    """
+    if assets is None:
+        if basepath == "/":
+            return html
+        return html.replace("href=\"/", f"href=\"{basepath}").replace("src=\"/", f"src=\"{basepath}")
+
+    def rewrite(match):
+        url = assets.urls.get("/" + match.group(2), "/" + match.group(2))
+        return f'{match.group(1)}="{basepath}{url[1:]}"'
+
+    return _URL_ATTR_RE.sub(rewrite, html)
+
+
+class Template:
+    """A page template parsed once into literal segments and named slots.
+
+    `{{ Name }}` placeholders become slots; everything else is kept as
+    literal text with the basepath rewrite already applied, so rendering a
+    page is a single join.
+    """
+
+    def __init__(self, text, basepath="/", assets=None):
+        self.parts = []  # literal strings and (name, placeholder) slot tuples
+        last = 0
+        for match in _SLOT_RE.finditer(text):
+            if match.start() > last:
+                self.parts.append(apply_basepath(text[last:match.start()], basepath, assets))
+            self.parts.append((match.group(1), match.group(0)))
+            last = match.end()
+        if last < len(text):
+            self.parts.append(apply_basepath(text[last:], basepath, assets))
+
+    def render(self, **values):
+        # Slots without a value are left as their original placeholder
+        return "".join(
+            part if isinstance(part, str) else values.get(part[0], part[1])
+            for part in self.parts
+        )
+
+    def write(self, out, stream_slot, write_stream, **values):
+        """Write the rendered template to the file-like `out`.
+
+        Slot `stream_slot` is filled by calling write_stream(out), so large
+        content never has to be held as one string.
+        """
+        for part in self.parts:
+            if isinstance(part, str):
+                out.write(part)
+            elif part[0] == stream_slot:
+                write_stream(out)
+            else:
+                out.write(values.get(part[0], part[1]))
+
+
+def load_template(template_path, basepath="/", assets=None):
+    """Return the compiled template for `template_path`, parsing it only once.
+
+    The cached copy is reused until the file's mtime or size changes.
+    """
+    key = (os.path.abspath(template_path), basepath, assets.digest if assets is not None else None)
+    stat = os.stat(template_path)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(template_path, "r", encoding="utf-8") as f:
+        template = Template(f.read(), basepath, assets)
+    _template_cache[key] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
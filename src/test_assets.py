@@ -0,0 +1,51 @@
+import contextlib
+import io
+import os
+import unittest
+
+from assets import AssetManifest, fingerprint_path
+from functions import generate_page, sync_tree
+from manifest import hash_file
+from sitetest import SiteTestCase
+
+
+class TestAssetManifest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def test_fingerprint_path(self):
+        self.assertEqual(fingerprint_path(os.path.join("css", "index.css"), "3f9a1c2b99"), os.path.join("css", "index.3f9a1c2b.css"))
+
+    def test_names_are_content_addressed(self):
+        first = AssetManifest.from_dir(self.static)
+        digest = hash_file(os.path.join(self.static, "index.css"))
+        self.assertEqual(first.urls["/index.css"], f"/index.{digest[:8]}.css")
+        self.assertEqual(AssetManifest.from_dir(self.static, first.stamps).urls, first.urls)
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        second = AssetManifest.from_dir(self.static, first.stamps)
+        self.assertNotEqual(second.urls["/index.css"], first.urls["/index.css"])
+        self.assertEqual(second.urls["/images/a.png"], first.urls["/images/a.png"])
+        self.assertNotEqual(second.digest, first.digest)
+
+    def test_sync_and_page_rewrite(self):
+        assets = AssetManifest.from_dir(self.static)
+        sync_tree(self.static, self.dest, aliases=assets.files)
+        css = assets.urls["/index.css"]
+        self.assertTrue(os.path.exists(os.path.join(self.dest, css[1:])))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+
+        page = os.path.join(self.content, "index.md")
+        self.write(self.template, '<link href="/index.css" />{{ Content }}')
+        self.write(page, "# Home\n\n![pic](/images/a.png) [home](/)")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_page(page, self.template, self.dest, "/site/", assets=assets)
+        html = self.read("index.html")
+        self.assertIn(f'href="/site{css}"', html)
+        self.assertIn(f'src="/site{assets.urls["/images/a.png"]}"', html)
+        self.assertIn('href="/site/"', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
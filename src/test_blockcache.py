@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import blockcache
+from blockcache import BlockCache, block_key
+from functions import generate_pages_recursive, markdown_to_html_node
+from sitetest import SiteTestCase
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = BlockCache(maxsize=2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key_depends_on_basepath(self):
+        self.assertNotEqual(block_key("[a](/b)", "/"), block_key("[a](/b)", "/site/"))
+
+    def test_cached_render_matches_uncached(self):
+        md = "# Title\n\nSee [home](/) and **this**\n\n- one\n- two"
+        cache = BlockCache()
+        first = markdown_to_html_node(md, cache, "/site/").to_html()
+        second = markdown_to_html_node(md, cache, "/site/").to_html()
+        self.assertEqual(first, second)
+        self.assertEqual(first, '<div><h1>Title</h1><p>See <a href="/site/">home</a> and <b>this</b></p><ul><li>one</li><li>two</li></ul></div>')
+        self.assertEqual(cache.hits, 3)
+
+    def test_persisted_between_builds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.json")
+            cache = blockcache.enable(path=path)
+            markdown_to_html_node("Shared footer", cache)
+            cache.save()
+            cache = blockcache.enable(path=path)
+            markdown_to_html_node("Shared footer", cache)
+            self.assertEqual(cache.hits, 1)
+            blockcache.disable()
+
+
+class TestParallelBlockCache(SiteTestCase):
+    def tearDown(self):
+        blockcache.disable()
+
+    def test_worker_blocks_reach_the_parent_cache(self):
+        for i in range(3):
+            self.write(os.path.join(self.content, f"post{i}.md"), f"# Post {i}\n\nShared footer")
+        cache = blockcache.enable()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, jobs=2)
+        self.assertEqual(len(cache.entries), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
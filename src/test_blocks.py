@@ -1,6 +1,9 @@
 import unittest
 
-from blocks import block_to_block_type, BlockType
+import blocks
+from blocks import BLOCK_HANDLERS, BLOCK_TAGS, block_to_block_type, block_type_to_html_tag, register_block_type, BlockType
+from functions import markdown_to_html_node
+from leafnode import LeafNode
 
 
 class TestBlockToBlockType(unittest.TestCase):
@@ -24,6 +27,46 @@ class TestBlockToBlockType(unittest.TestCase):
         result = block_to_block_type(block)
         self.assertEqual(result, BlockType.UNORDERDED_LIST)
 
+    def test_heading_levels(self):
+        self.assertEqual(block_to_block_type("### Three"), BlockType.HEADING3)
+        self.assertEqual(block_to_block_type("###### Six"), BlockType.HEADING6)
+        self.assertEqual(block_to_block_type("######## Deeper"), BlockType.HEADING6)
+
+    def test_ordered_list_and_paragraph_fallback(self):
+        self.assertEqual(block_to_block_type("12. Item"), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type("1999 was a year"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("-dash"), BlockType.PARAGRAPH)
+
+    def test_block_type_to_html_tag(self):
+        self.assertEqual(block_type_to_html_tag(BlockType.HEADING4), "h4")
+        with self.assertRaises(ValueError):
+            block_type_to_html_tag("unknown")
+
+
+class TestRegisterBlockType(unittest.TestCase):
+    def setUp(self):
+        matchers = {char: list(found) for char, found in blocks._MATCHERS.items()}
+        self.saved = (matchers, dict(BLOCK_TAGS), dict(BLOCK_HANDLERS))
+
+    def tearDown(self):
+        matchers, tags, handlers = self.saved
+        blocks._MATCHERS.clear()
+        blocks._MATCHERS.update(matchers)
+        BLOCK_TAGS.clear()
+        BLOCK_TAGS.update(tags)
+        BLOCK_HANDLERS.clear()
+        BLOCK_HANDLERS.update(handlers)
+
+    def test_horizontal_rule_plugin(self):
+        register_block_type(
+            "hr", "-", lambda block: "hr" if block == "---" else None,
+            tag="hr", handler=lambda block, tag: LeafNode(tag, ""),
+        )
+        self.assertEqual(block_to_block_type("---"), "hr")
+        self.assertEqual(block_to_block_type("- item"), BlockType.UNORDERDED_LIST)
+        html = markdown_to_html_node("Above\n\n---\n\nBelow").to_html()
+        self.assertEqual(html, "<div><p>Above</p><hr></hr><p>Below</p></div>")
+
 
 if __name__ == "__main__":
     unittest.main()
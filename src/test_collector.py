@@ -0,0 +1,39 @@
+import unittest
+
+from collector import Collector, PageRecorder
+
+
+class TestCollector(unittest.TestCase):
+    def test_enable_and_disable(self):
+        collector = Collector()
+        target = PageRecorder()
+        self.assertIs(collector.enable(target), target)
+        self.assertIs(collector.active(), target)
+        collector.disable()
+        self.assertIsNone(collector.active())
+
+    def test_nested_collecting(self):
+        collector = Collector()
+        collector.add(["ignored"])
+        with collector.collecting() as outer:
+            collector.add(["a"])
+            with collector.collecting() as inner:
+                collector.add(["b"])
+            collector.add(["c"])
+        self.assertEqual(outer, ["a", "c"])
+        self.assertEqual(inner, ["b"])
+
+    def test_disabled_collecting_gathers_nothing(self):
+        collector = Collector()
+        with collector.collecting(False) as values:
+            collector.add(["a"])
+        self.assertEqual(values, [])
+
+    def test_page_recorder(self):
+        recorder = PageRecorder()
+        recorder.add_page("a.md", "docs/a", ["/"])
+        self.assertEqual(recorder.records, [("a.md", "docs/a", ["/"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
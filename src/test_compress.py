@@ -0,0 +1,79 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import compress_file, compress_tree, parse_formats
+
+try:
+    import brotli  # noqa: F401
+    HAVE_BROTLI = True
+except ImportError:
+    HAVE_BROTLI = False
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = self.tmp.name
+        self.page = os.path.join(self.dest, "index.html")
+        self.write(self.page, "<p>hello</p>" * 200)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_parse_formats(self):
+        self.assertEqual(parse_formats("gzip"), ("gzip",))
+        with self.assertRaises(ValueError):
+            parse_formats("zip")
+
+    @unittest.skipIf(HAVE_BROTLI, "brotli is installed")
+    def test_missing_brotli_is_reported(self):
+        with self.assertRaises(ValueError):
+            parse_formats("gzip,br")
+
+    def test_gzip_sidecar_round_trips(self):
+        self.assertEqual(compress_file(self.page, min_size=10), 1)
+        with gzip.open(self.page + ".gz", "rb") as f, open(self.page, "rb") as original:
+            self.assertEqual(f.read(), original.read())
+        self.assertEqual(os.stat(self.page + ".gz").st_mtime_ns, os.stat(self.page).st_mtime_ns)
+
+    def test_current_sidecars_are_skipped(self):
+        self.assertEqual(compress_tree(self.dest, min_size=10), (1, 1))
+        self.assertEqual(compress_tree(self.dest, min_size=10), (0, 1))
+        self.write(self.page, "<p>changed</p>" * 200)
+        self.assertEqual(compress_tree(self.dest, min_size=10), (1, 1))
+
+    def test_force_rewrites_current_sidecars(self):
+        compress_tree(self.dest, level=1, min_size=10)
+        fast = os.path.getsize(self.page + ".gz")
+        self.assertEqual(compress_tree(self.dest, level=9, min_size=10), (0, 1))
+        self.assertEqual(compress_tree(self.dest, level=9, min_size=10, force=True), (1, 1))
+        self.assertLess(os.path.getsize(self.page + ".gz"), fast)
+
+    def test_small_and_binary_files_are_left_alone(self):
+        small = os.path.join(self.dest, "css", "a.css")
+        self.write(small, "a{}")
+        self.write(os.path.join(self.dest, "images", "a.png"), "x" * 5000)
+        written, checked = compress_tree(self.dest, min_size=10)
+        self.assertEqual((written, checked), (1, 2))
+        self.assertFalse(os.path.exists(small + ".gz"))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "a.png.gz")))
+
+    def test_orphaned_and_unrequested_sidecars_are_removed(self):
+        compress_tree(self.dest, min_size=10)
+        os.remove(self.page)
+        self.write(os.path.join(self.dest, "other.html"), "<p>x</p>" * 200)
+        compress_tree(self.dest, min_size=10)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        compress_tree(self.dest, ())
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "other.html.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
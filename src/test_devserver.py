@@ -0,0 +1,138 @@
+import contextlib
+import io
+import os
+import threading
+import unittest
+
+import linkgraph
+from assets import AssetManifest
+from devserver import ReloadNotifier, SiteWatcher
+from functions import generate_pages_recursive, page_hash, sync_tree
+from linkgraph import LinkGraph
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+
+
+class TestSiteWatcher(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+        manifest = BuildManifest.load(os.path.join(self.root, "manifest.json"), self.template)
+        manifest.assets = sync_tree(self.static, self.dest)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", manifest)
+
+    def poll(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            changed = self.watcher.poll()
+        return changed, out.getvalue()
+
+    def test_no_change(self):
+        self.assertEqual(self.poll()[0], False)
+
+    def test_changed_page_only_rebuilds_that_page(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited")
+        changed, log = self.poll()
+        self.assertTrue(changed)
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertIn("Edited", self.read("blog", "post", "index.html"))
+
+    def test_template_change_rebuilds_all_pages(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>")
+        _, log = self.poll()
+        self.assertEqual(log.count("Generating page"), 2)
+        self.assertEqual(self.read("index.html"), "<h1>Home</h1>")
+
+    def test_page_template_is_hashed_and_watched(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(os.path.join(self.root, "post.html"), "<article>{{ Content }}</article>")
+        self.write(post, "---\ntemplate: post.html\n---\n# Post")
+        self.poll()
+        self.assertEqual(self.watcher.manifest.pages[post]["hash"], page_hash(post, self.template))
+        self.write(os.path.join(self.root, "post.html"), "<main>{{ Content }}</main>")
+        _, log = self.poll()
+        self.assertEqual(log.count("Generating page"), 1)
+        self.assertEqual(self.read("blog", "post", "index.html"), "<main><h1>Post</h1></main>")
+
+    def test_link_graph_is_saved(self):
+        path = os.path.join(self.root, "link-graph.json")
+        linkgraph.enable(LinkGraph(path, self.dest))
+        self.addCleanup(linkgraph.disable)
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n[gone](/nowhere)")
+        self.poll()
+        post = os.path.join(self.content, "blog", "post.md")
+        self.assertEqual(LinkGraph.load(path, self.dest).dangling(), [(post, "/nowhere")])
+
+    def test_removed_page_and_asset(self):
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertEqual(self.watcher.manifest.assets, [])
+
+    def test_new_asset_is_synced(self):
+        self.write(os.path.join(self.static, "app.js"), "let x;")
+        self.poll()
+        self.assertEqual(self.read("app.js"), "let x;")
+        self.assertEqual(self.watcher.manifest.assets, ["app.js", "index.css"])
+
+
+class TestFingerprintedWatcher(SiteTestCase):
+    TEMPLATE = '<link href="/index.css" />{{ Content }}'
+
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        manifest = BuildManifest.load(os.path.join(self.root, "manifest.json"), self.template)
+        assets = self.publish(manifest)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/", manifest, assets=assets)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", manifest,
+                                   assets=assets, publish_assets=self.publish)
+
+    def publish(self, manifest):
+        assets = AssetManifest.from_dir(self.static, manifest.asset_stamps)
+        manifest.asset_stamps = assets.stamps
+        manifest.set_salt(assets.digest)
+        manifest.assets = sync_tree(self.static, self.dest, manifest.assets, aliases=assets.files)
+        return assets
+
+    def css_url(self):
+        return self.watcher.assets.urls["/index.css"]
+
+    def test_rebuilt_page_keeps_fingerprinted_links(self):
+        self.write(os.path.join(self.content, "index.md"), "# Edited")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.watcher.poll()
+        self.assertIn(f'href="{self.css_url()}"', self.read("index.html"))
+
+    def test_changed_asset_refingerprints_pages(self):
+        old_url = self.css_url()
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.watcher.poll()
+        self.assertNotEqual(self.css_url(), old_url)
+        self.assertIn(f'href="{self.css_url()}"', self.read("index.html"))
+        self.assertEqual(self.read(self.css_url()[1:]), "body { color: red }")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old_url[1:])))
+
+
+class TestReloadNotifier(unittest.TestCase):
+    def test_wait_returns_new_version(self):
+        notifier = ReloadNotifier()
+        threading.Timer(0.01, notifier.notify).start()
+        self.assertEqual(notifier.wait(0, timeout=5), 1)
+
+    def test_wait_times_out(self):
+        notifier = ReloadNotifier()
+        self.assertEqual(notifier.wait(0, timeout=0.01), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import contextlib
+import io
+import os
+import unittest
+
+from frontmatter import page_template, parse_front_matter, read_front_matter, split_front_matter
+from functions import generate_page, generate_pages_recursive
+from listing import section_entries
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+
+
+class TestParseFrontMatter(unittest.TestCase):
+    def test_values(self):
+        meta = parse_front_matter([
+            'title: "Tolkien: a life"',
+            "date: 2024-01-05",
+            "draft: false  # not yet",
+            "tags: [books, fantasy]",
+            "template: post.html",
+        ])
+        self.assertEqual(meta, {
+            "title": "Tolkien: a life",
+            "date": "2024-01-05",
+            "draft": False,
+            "tags": ["books", "fantasy"],
+            "template": "post.html",
+        })
+
+    def test_block_list_and_comma_tags(self):
+        self.assertEqual(parse_front_matter(["tags:", "  - books", "  - 'fantasy'"]), {"tags": ["books", "fantasy"]})
+        self.assertEqual(parse_front_matter(["tags: books, fantasy"]), {"tags": ["books", "fantasy"]})
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a pair"])
+        with self.assertRaises(ValueError):
+            parse_front_matter(["date: yesterday"])
+        with self.assertRaises(ValueError):
+            parse_front_matter(["title: Tom", "- item"])
+
+    def test_split(self):
+        meta, body = split_front_matter("---\ntitle: Tom\n---\n# Tom\n\nBody")
+        self.assertEqual(meta, {"title": "Tom"})
+        self.assertEqual(body, "# Tom\n\nBody")
+        self.assertEqual(split_front_matter("# Tom\n\n---\n"), ({}, "# Tom\n\n---\n"))
+
+    def test_unclosed_header_is_body_text(self):
+        self.assertEqual(split_front_matter("---\n# Tom"), ({}, "---\n# Tom"))
+
+    def test_page_template(self):
+        self.assertEqual(page_template("site/template.html", {}), "site/template.html")
+        self.assertEqual(page_template("site/template.html", {"template": "post.html"}), os.path.join("site", "post.html"))
+
+
+class TestFrontMatterPages(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.root, "post.html"), "<article>{{ Title }}</article>{{ Content }}")
+
+    def test_read_front_matter_reports_path(self):
+        path = os.path.join(self.content, "bad.md")
+        self.write(path, "---\nnot a pair\n---\n# Tom")
+        with self.assertRaisesRegex(ValueError, "bad.md"):
+            read_front_matter(path)
+
+    def test_unclosed_header_renders_as_body(self):
+        src = os.path.join(self.content, "tom.md")
+        self.write(src, "---\n# Tom\n\nHey dol!")
+        self.assertEqual(read_front_matter(src), {})
+        for large_file_size in (None, 0):
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_page(src, self.template, os.path.join(self.dest, f"tom{large_file_size}"),
+                              large_file_size=large_file_size)
+            self.assertEqual(self.read(f"tom{large_file_size}", "index.html"),
+                             "<title>Tom</title><p>--- # Tom</p><p>Hey dol!</p>")
+
+    def test_title_template_and_meta(self):
+        src = os.path.join(self.content, "tom.md")
+        self.write(src, "---\ntitle: Tom Bombadil\ntemplate: post.html\ndate: 2024-01-05\ntags: [poems]\n---\nHey dol!")
+        for large_file_size in (None, 0):
+            dest = os.path.join(self.dest, f"tom{large_file_size}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                meta = generate_page(src, self.template, dest, large_file_size=large_file_size)
+            self.assertEqual(self.read(f"tom{large_file_size}", "index.html"), "<article>Tom Bombadil</article><p>Hey dol!</p>")
+            self.assertEqual(meta["date"], "2024-01-05")
+            self.assertEqual(meta["tags"], ["poems"])
+
+    def test_drafts_are_skipped_and_removed(self):
+        manifest_path = os.path.join(self.root, "manifest.json")
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(post, "---\ndraft: false\n---\n# Post")
+
+        def build():
+            manifest = BuildManifest.load(manifest_path, self.template)
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                generate_pages_recursive(self.content, self.template, self.dest, manifest=manifest)
+            manifest.prune()
+            manifest.save()
+            return out.getvalue()
+
+        build()
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post", "index.html")))
+        self.write(post, "---\ndraft: true\n---\n# Post")
+        self.assertIn("Skipping draft", build())
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post")))
+
+    def test_template_change_regenerates_page(self):
+        manifest_path = os.path.join(self.root, "manifest.json")
+        src = os.path.join(self.content, "tom.md")
+        self.write(src, "---\ntemplate: post.html\n---\n# Tom")
+        for _ in range(2):
+            manifest = BuildManifest.load(manifest_path, self.template)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(self.content, self.template, self.dest, manifest=manifest)
+            manifest.save()
+        self.write(os.path.join(self.root, "post.html"), "<main>{{ Content }}</main>")
+        manifest = BuildManifest.load(manifest_path, self.template)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, manifest=manifest)
+        self.assertEqual(self.read("tom", "index.html"), "<main><h1>Tom</h1></main>")
+
+    def test_listing_sorts_by_date(self):
+        manifest = BuildManifest.load(os.path.join(self.root, "manifest.json"), self.template)
+        self.write(os.path.join(self.content, "blog", "old.md"), "---\ndate: 2020-01-01\n---\n# Old")
+        self.write(os.path.join(self.content, "blog", "new.md"), "---\ndate: 2024-01-01T12:00:00\n---\n# New")
+        os.utime(os.path.join(self.content, "blog", "old.md"), (1800000000, 1800000000))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, manifest=manifest)
+        entries = section_entries(manifest, self.content, "blog", self.dest)
+        self.assertEqual([entry["url"] for entry in entries], ["/blog/new", "/blog/old"])
+
+
+if __name__ == "__main__":
+    unittest.main()
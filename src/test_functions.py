@@ -1,6 +1,12 @@
+import contextlib
+import io
+import os
 import unittest
 
-from functions import markdown_to_blocks, markdown_to_html_node, split_nodes_delimiter
+from assets import AssetManifest
+from functions import find_pages, generate_page, generate_pages_recursive, sync_tree
+from functions import iter_blocks, markdown_to_blocks, markdown_to_html_node, split_nodes_delimiter
+from sitetest import SiteTestCase
 from textnode import TextNode, TextType
 from functions import extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
 
@@ -104,6 +110,22 @@ class TestSplitNodesDelimiter(unittest.TestCase):
         self.assertEqual(new_nodes[1], TextNode("this link", TextType.LINK, "https://www.example.com"))
         self.assertEqual(new_nodes[2], TextNode(" for more info", TextType.PLAIN))
 
+    def test_split_nodes_link_many_links(self):
+        # Far more links than the default recursion limit
+        node = TextNode("[a](u) " * 5000, TextType.PLAIN)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(len(new_nodes), 10000)
+        self.assertEqual(new_nodes[-2], TextNode("a", TextType.LINK, "u"))
+        self.assertEqual(new_nodes[-1], TextNode(" ", TextType.PLAIN))
+
+    def test_split_nodes_link_skips_images(self):
+        node = TextNode("![pic](img.png) and [pic](img.png)", TextType.PLAIN)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(new_nodes, [
+            TextNode("![pic](img.png) and ", TextType.PLAIN),
+            TextNode("pic", TextType.LINK, "img.png"),
+        ])
+
     def test_split_nodes_link_no_link(self):
         node = TextNode("Just plain text without links", TextType.PLAIN)
         new_nodes = split_nodes_link([node])
@@ -201,7 +223,45 @@ class TestTextToTextNodes(unittest.TestCase):
         for i, node in enumerate(nodes):
             self.assertEqual(node, expected[i])
 
-        
+
+    def test_text_to_textnodes_code_is_literal(self):
+        nodes = text_to_textnodes("Run `a**b**_c_` now")
+        self.assertEqual(nodes, [
+            TextNode("Run ", TextType.PLAIN),
+            TextNode("a**b**_c_", TextType.CODE),
+            TextNode(" now", TextType.PLAIN),
+        ])
+
+    def test_text_to_textnodes_underscores_in_link(self):
+        nodes = text_to_textnodes("See [my_page](https://example.com/a_b) and _this_")
+        self.assertEqual(nodes, [
+            TextNode("See ", TextType.PLAIN),
+            TextNode("my_page", TextType.LINK, "https://example.com/a_b"),
+            TextNode(" and ", TextType.PLAIN),
+            TextNode("this", TextType.ITALIC),
+        ])
+
+    def test_text_to_textnodes_stray_markers_are_plain(self):
+        nodes = text_to_textnodes("Wow! A [bracket and *star*")
+        self.assertEqual(nodes, [TextNode("Wow! A [bracket and *star*", TextType.PLAIN)])
+
+    def test_text_to_textnodes_link_text_is_literal(self):
+        self.assertEqual(text_to_textnodes("[**a**](b)"), [TextNode("**a**", TextType.LINK, "b")])
+
+    def test_text_to_textnodes_nested_emphasis_is_literal(self):
+        self.assertEqual(
+            text_to_textnodes("x _a **b** c_ y"),
+            [
+                TextNode("x ", TextType.PLAIN),
+                TextNode("a **b** c", TextType.ITALIC),
+                TextNode(" y", TextType.PLAIN),
+            ],
+        )
+
+    def test_text_to_textnodes_unbalanced_raises(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **broken")
+
     def test_markdown_to_blocks(self):
         md = """
 This is **bolded** paragraph
@@ -223,6 +283,16 @@ This is the same paragraph on a new line
         )
 
 
+    def test_markdown_to_blocks_keeps_fenced_code_whole(self):
+        md = "Intro\n\n```\nline one\n\nline two\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Intro", "```\nline one\n\nline two\n```", "Outro"],
+        )
+
+    def test_iter_blocks_from_file_lines(self):
+        lines = io.StringIO("# Title\r\n\r\nFirst\nstill first\n   \n- item\n")
+        self.assertEqual(list(iter_blocks(lines)), ["# Title", "First\nstill first", "- item"])
 
     def test_paragraphs(self):
         md = """
@@ -291,6 +361,16 @@ class TestMarkdownToHTMLNodeEdgeCases(unittest.TestCase):
             "<div><ol><li>Only one item here</li></ol></div>",
         )
 
+    def test_ordered_list_number_inside_item(self):
+        md = "1. Released in version 2. Later\n2. Second"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><ol><li>Released in version 2. Later</li><li>Second</li></ol></div>")
+
+    def test_code_block_with_blank_line(self):
+        md = "```\nfirst\n\nsecond\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>first\n\nsecond</code></pre></div>")
+
     def test_quote_with_inline_formatting(self):
         """Test quote block with bold and italic formatting"""
         md = """
@@ -322,7 +402,122 @@ This is a paragraph with **bold** and `code`.
             "<div><h1>Header</h1><p>This is a paragraph with <b>bold</b> and <code>code</code>.</p><blockquote>A quote here</blockquote><ul><li>List item one</li><li>List item two</li></ul></div>",
         )
 
-    
+
+
+class TestGeneratePages(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        for i in range(4):
+            self.write(os.path.join(self.content, "blog", f"post{i}.md"), f"# Post {i}")
+
+    def test_find_pages(self):
+        pages = sorted(find_pages(self.content, self.dest))
+        self.assertEqual(pages[0], (os.path.join(self.content, "blog", "post0.md"), os.path.join(self.dest, "blog", "post0")))
+        self.assertEqual(pages[-1], (os.path.join(self.content, "index.md"), self.dest))
+        self.assertEqual(len(pages), 5)
+
+    def test_basepath_rewrites_template_and_links(self):
+        self.write(self.template, '<link href="/index.css" />{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Post](/blog/post0) ![pic](/images/a.png) [out](https://example.com)")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_page(os.path.join(self.content, "index.md"), self.template, self.dest, "/site/")
+        self.assertEqual(
+            self.read("index.html"),
+            '<link href="/site/index.css" /><h1>Home</h1><p><a href="/site/blog/post0">Post</a> '
+            '<img src="/site/images/a.png" alt="pic" /> <a href="https://example.com">out</a></p>',
+        )
+
+    def test_parallel_matches_sequential(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, jobs=3)
+        for i in range(4):
+            self.assertEqual(self.read("blog", f"post{i}", "index.html"), f"<title>Post {i}</title><h1>Post {i}</h1>")
+
+    def test_parallel_workers_receive_assets(self):
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(self.template, '<link href="/index.css" />{{ Content }}')
+        assets = AssetManifest.from_dir(self.static)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, jobs=2, assets=assets)
+        for i in range(4):
+            self.assertIn(f'href="{assets.urls["/index.css"]}"', self.read("blog", f"post{i}", "index.html"))
+
+    def test_parallel_collects_errors(self):
+        self.write(os.path.join(self.content, "blog", "post1.md"), "no title")
+        self.write(os.path.join(self.content, "blog", "post2.md"), "no title either")
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(ValueError) as context:
+                generate_pages_recursive(self.content, self.template, self.dest, jobs=3)
+        self.assertIn("2 page(s) failed", str(context.exception))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post3", "index.html")))
+
+    def test_large_file_mode_matches_normal_output(self):
+        md = "# Home\n\nSome **bold** [link](/blog/post0)\n\n```\ncode\n\nstill code\n```\n\n- a\n- b\r\n\n> quote"
+        src = os.path.join(self.content, "index.md")
+        self.write(src, md)
+        streamed = os.path.join(self.dest, "streamed")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_page(src, self.template, self.dest, "/site/")
+            generate_page(src, self.template, streamed, "/site/", large_file_size=0)
+        with open(os.path.join(self.dest, "index.html"), "rb") as normal, open(os.path.join(streamed, "index.html"), "rb") as f:
+            self.assertEqual(f.read(), normal.read())
+
+    def test_large_file_mode_leaves_identical_output_alone(self):
+        src = os.path.join(self.content, "index.md")
+        output = os.path.join(self.dest, "index.html")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_page(src, self.template, self.dest, large_file_size=0)
+            os.utime(output, ns=(0, 0))
+            generate_page(src, self.template, self.dest, large_file_size=0)
+        self.assertEqual(os.stat(output).st_mtime_ns, 0)
+        self.assertEqual(os.listdir(self.dest), ["index.html"])
+
+
+class TestSyncTree(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def test_copies_tree_and_returns_paths(self):
+        synced = sync_tree(self.static, self.dest)
+        self.assertEqual(synced, [os.path.join("images", "a.png"), "index.css"])
+        self.assertEqual(self.read("images", "a.png"), "png")
+
+    def test_unchanged_files_are_not_copied(self):
+        sync_tree(self.static, self.dest)
+        css = os.path.join(self.dest, "index.css")
+        inode = os.stat(css).st_ino
+        sync_tree(self.static, self.dest)
+        self.assertEqual(os.stat(css).st_ino, inode)
+
+    def test_changed_file_is_copied(self):
+        sync_tree(self.static, self.dest)
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        sync_tree(self.static, self.dest)
+        self.assertEqual(self.read("index.css"), "body { color: red }")
+
+    def test_checksum_detects_same_size_change(self):
+        sync_tree(self.static, self.dest)
+        src_css = os.path.join(self.static, "index.css")
+        stat = os.stat(src_css)
+        self.write(src_css, "body []")
+        os.utime(src_css, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        sync_tree(self.static, self.dest, checksum=True)
+        self.assertEqual(self.read("index.css"), "body []")
+
+    def test_removes_only_previously_synced_files(self):
+        previous = sync_tree(self.static, self.dest)
+        self.write(os.path.join(self.dest, "index.html"), "generated page")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        sync_tree(self.static, self.dest, previous)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_hardlink_mode(self):
+        sync_tree(self.static, self.dest, link="hardlink")
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"), os.path.join(self.dest, "index.css")))
 
 
 if __name__ == "__main__":
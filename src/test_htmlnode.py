@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode
@@ -20,6 +21,11 @@ class TestHTMLNode(unittest.TestCase):
 		with self.assertRaises(NotImplementedError):
 			node.to_html()
 
+	def test_write_html_not_implemented(self):
+		node = HTMLNode(tag="div", value="content")
+		with self.assertRaises(NotImplementedError):
+			node.write_html(io.StringIO())
+
 
 if __name__ == "__main__":
 	unittest.main()
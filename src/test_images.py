@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetManifest
+from functions import markdown_to_html_node, rewrite_links
+from images import ImageCache, _cache_file, place_images, responsive_images, variant_path
+
+try:
+    import PIL  # noqa: F401
+    HAVE_PILLOW = True
+except ImportError:
+    HAVE_PILLOW = False
+
+
+class TestResponsiveImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.static = os.path.join(root, "static")
+        self.dest = os.path.join(root, "docs")
+        self.cache_dir = os.path.join(root, "cache")
+        os.makedirs(os.path.join(self.static, "images"))
+        os.makedirs(self.cache_dir)
+        with open(os.path.join(self.static, "images", "a.png"), "wb") as f:
+            f.write(b"png")
+        with open(os.path.join(self.static, "index.css"), "w", encoding="utf-8") as f:
+            f.write("body {}")
+        self.stamps = AssetManifest.from_dir(self.static, fingerprint=False).stamps
+        self.digest = self.stamps[os.path.join("images", "a.png")][2]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def seed_cache(self):
+        # Pretend a previous build already resized a.png to 480 pixels
+        cache = ImageCache(self.cache_dir, widths=(480, 960))
+        cache.entries[self.digest] = {"width": 800, "height": 400, "variants": [480]}
+        with open(_cache_file(self.cache_dir, self.digest, 480, ".png"), "wb") as f:
+            f.write(b"small")
+        cache.save()
+        return cache
+
+    def test_variant_path(self):
+        self.assertEqual(variant_path(os.path.join("images", "a.png"), "3f9a1c2b99", 480),
+                         os.path.join("images", "a.3f9a1c2b-480w.png"))
+
+    def test_cached_variants_are_reused(self):
+        self.seed_cache()
+        cache = ImageCache(self.cache_dir, widths=(480, 960))
+        cache.load()
+        images, outputs = responsive_images(self.static, self.stamps, cache)
+        self.assertEqual(cache.generated, 0)
+        published = variant_path(os.path.join("images", "a.png"), self.digest, 480)
+        self.assertEqual(list(images), ["/images/a.png"])
+        self.assertEqual(images["/images/a.png"]["srcset"], [["/" + published, 480], ["/images/a.png", 800]])
+        self.assertEqual(outputs, {published: _cache_file(self.cache_dir, self.digest, 480, ".png")})
+
+    def test_cache_is_dropped_when_widths_change(self):
+        self.seed_cache()
+        cache = ImageCache(self.cache_dir, widths=(320,))
+        cache.load()
+        self.assertEqual(cache.entries, {})
+
+    @unittest.skipIf(HAVE_PILLOW, "Pillow is installed")
+    def test_missing_pillow_is_reported(self):
+        with self.assertRaises(ValueError):
+            responsive_images(self.static, self.stamps, ImageCache(self.cache_dir))
+
+    def test_place_images_removes_stale_variants(self):
+        cache = self.seed_cache()
+        _, outputs = responsive_images(self.static, self.stamps, cache)
+        placed = place_images(outputs, self.dest)
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, placed[0])))
+        self.assertEqual(place_images({}, self.dest, placed), [])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, placed[0])))
+
+    def test_img_gets_srcset_and_size(self):
+        assets = AssetManifest({}, images={
+            "/images/a.png": {
+                "width": 800, "height": 400, "sizes": "(max-width: 800px) 100vw, 800px",
+                "srcset": [["/images/a.x-480w.png", 480], ["/images/a.png", 800]],
+            },
+        })
+        node = markdown_to_html_node("![A](/images/a.png)")
+        rewrite_links(node, "/site/", assets)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><img src="/site/images/a.png" alt="A" width="800" height="400" '
+            'srcset="/site/images/a.x-480w.png 480w, /site/images/a.png 800w" '
+            'sizes="(max-width: 800px) 100vw, 800px" /></p></div>',
+        )
+
+    @unittest.skipUnless(HAVE_PILLOW, "Pillow is not installed")
+    def test_variants_are_generated(self):
+        from PIL import Image
+
+        path = os.path.join(self.static, "images", "a.png")
+        Image.new("RGB", (1000, 500)).save(path)
+        stamps = AssetManifest.from_dir(self.static, fingerprint=False).stamps
+        cache = ImageCache(self.cache_dir, widths=(480, 960, 1600))
+        images, outputs = responsive_images(self.static, stamps, cache, jobs=1)
+        self.assertEqual(cache.generated, 1)
+        self.assertEqual([width for _, width in images["/images/a.png"]["srcset"]], [480, 960, 1000])
+        for cache_path in outputs.values():
+            with Image.open(cache_path) as variant:
+                self.assertIn(variant.size, [(480, 240), (960, 480)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,10 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode(tag="p", value="Text")
         self.assertIsNone(node.children)
 
+    def test_leaf_node_has_no_instance_dict(self):
+        node = LeafNode(tag="p", value="Text")
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import contextlib
+import io
+import os
+import unittest
+
+import linkgraph
+from blockcache import BlockCache
+from collector import PageRecorder
+from functions import drop_drafts, find_pages, generate_pages_recursive, markdown_to_html_node
+from linkgraph import LinkGraph, normalize_url
+from sitetest import SiteTestCase
+
+
+class TestCollectLinks(unittest.TestCase):
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("/blog/tom/#intro"), "/blog/tom")
+        self.assertEqual(normalize_url("/?page=2"), "/")
+        self.assertIsNone(normalize_url("https://www.boot.dev"))
+        self.assertIsNone(normalize_url("//cdn.example.com/a.js"))
+
+    def test_links_are_collected_from_cached_blocks(self):
+        cache = BlockCache()
+        md = "See [Tom](/blog/tom) and ![img](/images/tom.png)"
+        linkgraph.enable(PageRecorder())
+        try:
+            with linkgraph.collecting() as first:
+                markdown_to_html_node(md, cache)
+            with linkgraph.collecting() as second:
+                markdown_to_html_node(md, cache)
+        finally:
+            linkgraph.disable()
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(first, ["/blog/tom"])
+        self.assertEqual(second, ["/blog/tom"])
+
+
+class TestLinkGraph(SiteTestCase):
+    TEMPLATE = "{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "link-graph.json")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Tom](/blog/tom/) and [Gone](/blog/gone)")
+        self.write(os.path.join(self.content, "blog", "tom.md"), "# Tom\n\n[Home](/) and [CSS](/index.css)")
+
+    def tearDown(self):
+        linkgraph.disable()
+
+    def build(self, jobs=1):
+        graph = linkgraph.enable(LinkGraph.load(self.path, self.dest))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, jobs=jobs)
+        linkgraph.disable()
+        graph.save()
+        return graph
+
+    def test_dangling_links(self):
+        graph = self.build()
+        index = os.path.join(self.content, "index.md")
+        tom = os.path.join(self.content, "blog", "tom.md")
+        self.assertEqual(graph.pages[tom], {"url": "/blog/tom", "links": ["/", "/index.css"]})
+        self.assertEqual(graph.dangling({"/index.css"}), [(index, "/blog/gone")])
+        self.assertEqual(graph.dangling(), [(tom, "/index.css"), (index, "/blog/gone")])
+
+    def test_parallel_build_records_the_same_graph(self):
+        sequential = self.build().pages
+        os.remove(self.path)
+        self.assertEqual(self.build(jobs=2).pages, sequential)
+
+    def test_moved_page_marks_only_linking_pages_stale(self):
+        self.build()
+        os.rename(os.path.join(self.content, "blog", "tom.md"), os.path.join(self.content, "blog", "bombadil.md"))
+        graph = LinkGraph.load(self.path, self.dest)
+        self.assertTrue(graph.loaded)
+        stale = graph.stale_pages(find_pages(self.content, self.dest))
+        self.assertEqual(stale, {os.path.join(self.content, "index.md")})
+
+    def test_page_turned_draft_marks_linking_pages_stale(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "tom.md"), "---\ndraft: true\n---\n# Tom")
+        graph = LinkGraph.load(self.path, self.dest)
+        stale = graph.stale_pages(drop_drafts(find_pages(self.content, self.dest)))
+        self.assertEqual(stale, {os.path.join(self.content, "index.md")})
+
+    def test_new_page_fixes_dangling_link(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "gone.md"), "# Gone\n\nBack again")
+        graph = LinkGraph.load(self.path, self.dest)
+        self.assertEqual(graph.stale_pages(find_pages(self.content, self.dest)), {os.path.join(self.content, "index.md")})
+        graph = self.build()
+        self.assertEqual(graph.dangling({"/index.css"}), [])
+
+    def test_prune_drops_links_of_deleted_pages(self):
+        graph = self.build()
+        graph.prune({os.path.join(self.content, "blog", "tom.md")})
+        self.assertEqual(graph.linking_to(["/blog/tom"]), set())
+        self.assertEqual(graph.linking_to(["/"]), {os.path.join(self.content, "blog", "tom.md")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import os
+import unittest
+
+from functions import generate_pages_recursive
+from listing import listing_url, listing_urls, remove_listing, section_entries, write_feed, write_listing
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+
+
+class TestListing(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        for i in range(3):
+            path = os.path.join(self.content, "blog", f"post{i}.md")
+            self.write(path, f"# Post {i}\n\n## Intro\n\nFirst **paragraph** {i}\n\nSecond paragraph")
+            os.utime(path, (1700000000 + i * 86400, 1700000000 + i * 86400))
+
+    def build(self, jobs=1):
+        manifest = BuildManifest.load(self.manifest_path, self.template)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, manifest=manifest, jobs=jobs)
+        manifest.prune()
+        manifest.save()
+        return manifest
+
+    def test_metadata_is_kept_for_skipped_pages(self):
+        first = self.build()
+        self.assertEqual(self.build().pages, first.pages)
+        meta = first.pages[os.path.join(self.content, "blog", "post1.md")]["meta"]
+        self.assertEqual(meta["title"], "Post 1")
+        self.assertEqual(meta["summary"], "<p>First <b>paragraph</b> 1</p>")
+        self.assertEqual(meta["mtime"], 1700000000 + 86400)
+
+    def test_parallel_build_records_metadata(self):
+        manifest = self.build(jobs=2)
+        self.assertTrue(all("meta" in entry for entry in manifest.pages.values()))
+
+    def test_entries_are_newest_first(self):
+        entries = section_entries(self.build(), self.content, "blog", self.dest)
+        self.assertEqual([entry["url"] for entry in entries], ["/blog/post2", "/blog/post1", "/blog/post0"])
+
+    def test_listing_is_paginated(self):
+        entries = section_entries(self.build(), self.content, "blog", self.dest)
+        self.assertEqual(write_listing(entries, "blog", self.dest, self.template, "/site/", page_size=2), 2)
+        first = self.read("blog", "index.html")
+        self.assertIn('<a href="/site/blog/post2">Post 2</a>', first)
+        self.assertIn("<p>First <b>paragraph</b> 2</p>", first)
+        self.assertIn('<a href="/site/blog/page/2" rel="next">Older posts</a>', first)
+        second = self.read("blog", "page", "2", "index.html")
+        self.assertIn("Post 0", second)
+        self.assertIn('<a href="/site/blog" rel="prev">Newer posts</a>', second)
+
+        self.assertEqual(write_listing(entries, "blog", self.dest, self.template, "/site/", page_size=10), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "page", "2")))
+
+    def test_feed(self):
+        entries = section_entries(self.build(), self.content, "blog", self.dest)
+        write_feed(entries, "blog", self.dest, "/site/", "https://example.com", size=2)
+        feed = self.read("blog", "feed.xml")
+        self.assertIn('<link rel="self" href="https://example.com/site/blog/feed.xml" />', feed)
+        self.assertIn("<updated>2023-11-16T22:13:20Z</updated>", feed)
+        self.assertIn("&lt;p&gt;First &lt;b&gt;paragraph&lt;/b&gt; 2&lt;/p&gt;", feed)
+        self.assertEqual(feed.count("<entry>"), 2)
+
+    def test_remove_listing(self):
+        entries = section_entries(self.build(), self.content, "blog", self.dest)
+        write_listing(entries, "blog", self.dest, self.template, page_size=2)
+        write_feed(entries, "blog", self.dest)
+        remove_listing("blog", self.dest)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.dest, "blog"))), ["post0", "post1", "post2"])
+
+    def test_listing_url(self):
+        self.assertEqual(listing_url("blog", 1), "/blog")
+        self.assertEqual(listing_url("blog", 3), "/blog/page/3")
+        self.assertEqual(listing_urls("blog", 2), ["/blog", "/blog/page/2", "/blog/feed.xml"])
+
+
+if __name__ == "__main__":
+    unittest.main()
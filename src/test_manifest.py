@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from functions import generate_pages_recursive
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+
+
+class TestBuildManifest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+
+    def build(self):
+        manifest = BuildManifest.load(self.manifest_path, self.template)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        removed = manifest.prune()
+        manifest.save()
+        return removed
+
+    def output_mtimes(self):
+        mtimes = {}
+        for root, _, files in os.walk(self.dest):
+            for name in files:
+                path = os.path.join(root, name)
+                mtimes[path] = os.stat(path).st_mtime_ns
+        return mtimes
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        post_out = os.path.join(self.dest, "blog", "post", "index.html")
+        os.utime(post_out, ns=(0, 0))
+        self.build()
+        self.assertEqual(os.stat(post_out).st_mtime_ns, 0)
+
+    def test_changed_page_is_rebuilt(self):
+        self.build()
+        post_out = os.path.join(self.dest, "blog", "post", "index.html")
+        index_out = os.path.join(self.dest, "index.html")
+        os.utime(post_out, ns=(0, 0))
+        os.utime(index_out, ns=(0, 0))
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited")
+        self.build()
+        self.assertNotEqual(os.stat(post_out).st_mtime_ns, 0)
+        self.assertEqual(os.stat(index_out).st_mtime_ns, 0)
+        with open(post_out, encoding="utf-8") as f:
+            self.assertIn("Edited", f.read())
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        for path in self.output_mtimes():
+            os.utime(path, ns=(0, 0))
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        for mtime in self.output_mtimes().values():
+            self.assertNotEqual(mtime, 0)
+
+    def test_deleted_source_output_is_removed_on_full_rebuild(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build(), [os.path.join(self.content, "blog", "post.md")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post")))
+
+    def test_deleted_source_output_is_removed(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        removed = self.build()
+        self.assertEqual(removed, [os.path.join(self.content, "blog", "post.md")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
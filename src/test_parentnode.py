@@ -63,6 +63,21 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_write_html_streams_fragments(self):
+        class Collector:
+            def __init__(self):
+                self.parts = []
+
+            def write(self, text):
+                self.parts.append(text)
+
+        inner = ParentNode("span", [LeafNode("b", "bold"), LeafNode(value="text")])
+        parent = ParentNode("div", [inner])
+        out = Collector()
+        parent.write_html(out)
+        self.assertEqual(out.parts, ["<div>", "<span>", "<b>bold</b>", "text", "</span>", "</div>"])
+        self.assertEqual("".join(out.parts), parent.to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+import unittest
+
+import profiling
+from functions import markdown_to_html_node
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_records_nothing(self):
+        self.assertIsNone(profiling.active())
+        with profiling.stage("read"):
+            pass
+
+    def test_stages_and_pages_are_recorded(self):
+        profiler = profiling.enable()
+        with profiling.page("a.md"):
+            markdown_to_html_node("# Title\n\nSome **text**")
+        self.assertEqual(profiler.stages["blocks"][0], 1)
+        self.assertEqual(profiler.stages["inline"][0], 2)
+        self.assertIn("a.md", profiler.pages)
+        self.assertTrue(all(event[1] == "a.md" for event in profiler.events))
+
+    def test_merge_combines_counts(self):
+        profiler = profiling.enable()
+        with profiling.stage("read"):
+            pass
+        other = profiling.Profiler()
+        with other.stage("read"):
+            pass
+        profiler.merge(other.export())
+        self.assertEqual(profiler.stages["read"][0], 2)
+        self.assertEqual(len(profiler.events), 2)
+
+    def test_exports(self):
+        profiler = profiling.enable()
+        with profiling.page("a.md"):
+            with profiling.stage("read"):
+                pass
+        self.assertIn("a.md", profiler.summary())
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = os.path.join(tmp, "trace.json")
+            profiler.write_trace(trace_path)
+            with open(trace_path, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+            self.assertEqual([event["name"] for event in events], ["read", "page"])
+            self.assertEqual(events[0]["args"], {"page": "a.md"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+import search
+from blockcache import BlockCache
+from collector import PageRecorder
+from functions import generate_page, generate_pages_recursive, markdown_to_html_node
+from search import SearchIndex, remove_index, tokenize
+from sitetest import SiteTestCase
+
+
+class TestCollectText(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("The Hobbit, a Tale: THERE and back"), ["the", "hobbit", "tale", "there", "and", "back"])
+
+    def test_only_plain_bold_and_italic_text_is_collected(self):
+        md = "# Title\n\nSome **bold** and _italic_ with `code` and [a link](/x)\n\n```\nnot this\n```"
+        with search.collecting() as text:
+            markdown_to_html_node(md)
+        self.assertEqual(" ".join(text).split(), ["Title", "Some", "bold", "and", "italic", "with", "and"])
+
+    def test_cached_blocks_are_collected_too(self):
+        cache = BlockCache()
+        search.enable(PageRecorder())
+        try:
+            markdown_to_html_node("Shared **footer**", cache)
+            with search.collecting() as text:
+                markdown_to_html_node("Shared **footer**", cache)
+        finally:
+            search.disable()
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(" ".join(text).split(), ["Shared", "footer"])
+
+    def test_cache_keeps_no_text_while_search_is_off(self):
+        cache = BlockCache()
+        markdown_to_html_node("Shared **footer**", cache)
+        self.assertEqual([entry[1] for entry in cache.entries.values()], [""])
+
+
+class TestSearchIndex(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state = os.path.join(self.root, "search-state.json")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome to hobbiton")
+        self.write(os.path.join(self.content, "blog", "tom.md"), "# Tom\n\nBombadil sings in the forest")
+
+    def tearDown(self):
+        search.disable()
+
+    def read_shard(self, prefix):
+        with open(os.path.join(self.dest, "search", f"{prefix}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def build(self, jobs=1):
+        index = search.enable(SearchIndex.load(self.dest, self.state))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, jobs=jobs)
+        index.save()
+        search.disable()
+        return index
+
+    def test_index_is_sharded_by_prefix(self):
+        self.build()
+        with open(os.path.join(self.dest, "search", "pages.json"), encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        self.assertEqual(sorted(pages.values()), [["/", "Home"], ["/blog/tom/", "Tom"]])
+        tom_id = [int(doc_id) for doc_id, (url, _) in pages.items() if url == "/blog/tom/"][0]
+        self.assertEqual(self.read_shard("bo"), {"bombadil": [[tom_id, 1]]})
+        self.assertEqual(self.read_shard("ho")["home"], [[1 - tom_id, 2]])
+
+    def test_parallel_build_matches_sequential(self):
+        self.build()
+        with open(os.path.join(self.dest, "search", "pages.json"), encoding="utf-8") as f:
+            sequential = f.read()
+        os.remove(self.state)
+        self.build(jobs=2)
+        with open(os.path.join(self.dest, "search", "pages.json"), encoding="utf-8") as f:
+            self.assertEqual(sorted(json.loads(f.read())["pages"].values()), sorted(json.loads(sequential)["pages"].values()))
+
+    def test_only_touched_shards_are_rewritten(self):
+        self.build()
+        forest = os.path.join(self.dest, "search", "fo.json")
+        welcome = os.path.join(self.dest, "search", "we.json")
+        mtime = os.stat(welcome).st_mtime_ns
+        index = SearchIndex.load(self.dest, self.state)
+        self.assertTrue(index.loaded)
+        index.add_page(os.path.join(self.content, "blog", "tom.md"), os.path.join(self.dest, "blog", "tom"),
+                       "Tom", "Bombadil sings by the river")
+        self.assertEqual(index.dirty, {"by", "fo", "in", "ri", "to"})
+        index.save()
+        self.assertFalse(os.path.exists(forest))
+        self.assertIn("river", self.read_shard("ri"))
+        self.assertEqual(os.stat(welcome).st_mtime_ns, mtime)
+
+    def test_prune_drops_deleted_pages(self):
+        self.build()
+        index = SearchIndex.load(self.dest, self.state)
+        index.prune({os.path.join(self.content, "index.md")})
+        index.save()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "bo.json")))
+        self.assertNotIn("Tom", json.dumps(self.read_shard("pages")))
+
+    def test_streamed_page_is_indexed_the_same(self):
+        src = os.path.join(self.content, "blog", "tom.md")
+        self.write(src, "# Tom\n\nBombadil **sings**\n\nIn the forest, the old forest")
+        terms = []
+        for large_file_size in (None, 0):
+            index = search.enable(SearchIndex(self.dest, self.state))
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_page(src, self.template, self.dest, large_file_size=large_file_size)
+            search.disable()
+            terms.append(index.pages[src]["terms"])
+        self.assertEqual(terms[0], terms[1])
+        self.assertEqual(terms[1]["forest"], 2)
+
+    def test_remove_index_keeps_pages_under_search(self):
+        self.write(os.path.join(self.content, "search", "index.md"), "# Search\n\nFind things")
+        self.build()
+        remove_index(self.dest, self.state)
+        self.assertEqual(os.listdir(os.path.join(self.dest, "search")), ["index.html"])
+        self.assertFalse(os.path.exists(self.state))
+
+    def test_remove_index_without_state(self):
+        self.build()
+        os.remove(self.state)
+        remove_index(self.dest, self.state)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from functions import drop_drafts, find_pages, generate_pages_recursive
+from shards import assign_shards, merge_shards, parse_shard, write_shard_manifest
+from sitetest import SiteTestCase
+
+
+class TestShards(SiteTestCase):
+    TEMPLATE = "{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.shards_dir = os.path.join(self.root, "shards")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        for i in range(6):
+            self.write(os.path.join(self.content, "blog", f"post{i}.md"), f"# Post {i}\n\n" + "words " * (i * 50))
+
+    def build_shard(self, index, count):
+        shard_root = os.path.join(self.shards_dir, f"shard-{index}")
+        shard_docs = os.path.join(shard_root, "docs")
+        with contextlib.redirect_stdout(io.StringIO()):
+            shard_pages = generate_pages_recursive(self.content, self.template, shard_docs, shard=(index, count))
+        all_pages = drop_drafts(find_pages(self.content, shard_docs))
+        write_shard_manifest(shard_root, index, count, all_pages, shard_pages, shard_docs)
+        return shard_root
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "x/4", "3"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_assign_shards_is_balanced_and_complete(self):
+        pages = find_pages(self.content, "docs")
+        shards = assign_shards(pages, 3)
+        self.assertEqual(sorted(page for shard in shards for page in shard), sorted(pages))
+        loads = [sum(os.path.getsize(src) for src, _ in shard) for shard in shards]
+        largest = max(os.path.getsize(src) for src, _ in pages)
+        self.assertLessEqual(max(loads) - min(loads), largest)
+        self.assertEqual(assign_shards(list(reversed(pages)), 3), shards)
+
+    def test_merge_combines_all_shards(self):
+        for index in (1, 2, 3):
+            self.build_shard(index, 3)
+        merged = merge_shards(self.shards_dir, self.dest)
+        self.assertEqual(len(merged), 7)
+        self.assertEqual(merged[os.path.join(self.content, "index.md")], self.dest)
+        self.assertTrue(self.read("blog", "post3", "index.html").startswith("<h1>Post 3</h1>"))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_drafts_are_left_out_of_the_merge(self):
+        self.write(os.path.join(self.content, "blog", "draft.md"), "---\ndraft: true\n---\n# Draft")
+        for index in (1, 2):
+            self.build_shard(index, 2)
+        self.assertEqual(len(merge_shards(self.shards_dir, self.dest)), 7)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "draft")))
+
+    def test_merge_rejects_missing_and_duplicate_pages(self):
+        first = self.build_shard(1, 2)
+        second = self.build_shard(2, 2)
+        with open(os.path.join(first, "shard.json"), encoding="utf-8") as f:
+            duplicated = next(iter(json.load(f)["pages"]))
+        path = os.path.join(second, "shard.json")
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        missing = next(iter(data["pages"]))
+        del data["pages"][missing]
+        data["pages"][duplicated] = "dup"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        with self.assertRaises(ValueError) as context:
+            merge_shards(self.shards_dir, self.dest)
+        message = str(context.exception)
+        self.assertIn(f"missing page {missing}", message)
+        self.assertIn(f"duplicate page {duplicated} in shards [1, 2]", message)
+
+
+if __name__ == "__main__":
+    unittest.main()
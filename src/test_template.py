@@ -0,0 +1,47 @@
+import io
+import os
+import tempfile
+import unittest
+
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_fills_slots(self):
+        template = Template("<title>{{ Title }}</title><article>{{Content}}</article>")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>x</p>"),
+            "<title>Hi</title><article><p>x</p></article>",
+        )
+
+    def test_missing_slot_keeps_placeholder(self):
+        template = Template("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render(Title="Hi"), "Hi {{ Footer }}")
+
+    def test_basepath_applied_to_literals_only(self):
+        template = Template('<link href="/index.css" />{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render(Content='<a href="/raw">'),
+            '<link href="/site/index.css" /><a href="/raw">',
+        )
+
+    def test_write_streams_one_slot(self):
+        out = io.StringIO()
+        Template("<title>{{ Title }}</title>{{ Content }}<p>{{ Other }}</p>").write(
+            out, "Content", lambda f: f.write("<h1>Hi</h1>"), Title="T")
+        self.assertEqual(out.getvalue(), "<title>T</title><h1>Hi</h1><p>{{ Other }}</p>")
+
+    def test_load_template_is_cached_until_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            self.assertEqual(load_template(path).render(Title="Hi"), "<h1>Hi</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,12 @@ class TestTextNode(unittest.TestCase):
         expected = f"TextNode({node.text}, {node.text_type.value}, {node.url})"
         self.assertEqual(repr(node), expected)
 
+    def test_slots_no_instance_dict(self):
+        node = TextNode("plain text")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
     def test_text(self):
         node = TextNode("This is a text node", TextType.PLAIN)
         html_node = text_node_to_html_node(node)
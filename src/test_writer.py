@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from writer import OutputWriter, write_output
+
+
+class TestWriteOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "a", "b", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_creates_directories_and_writes(self):
+        self.assertTrue(write_output(self.path, b"<p>hi</p>"))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>hi</p>")
+
+    def test_unchanged_bytes_keep_mtime(self):
+        write_output(self.path, b"<p>hi</p>")
+        os.utime(self.path, ns=(0, 0))
+        self.assertFalse(write_output(self.path, b"<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertTrue(write_output(self.path, b"<p>ho</p>"))
+        self.assertNotEqual(os.stat(self.path).st_mtime_ns, 0)
+
+
+class TestOutputWriter(unittest.TestCase):
+    def test_writes_all_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with OutputWriter(workers=3, max_pending=2) as writer:
+                for i in range(10):
+                    writer.submit(os.path.join(tmp, f"page{i}", "index.html"), f"page {i}")
+            self.assertEqual(writer.written, 10)
+            with open(os.path.join(tmp, "page7", "index.html"), encoding="utf-8") as f:
+                self.assertEqual(f.read(), "page 7")
+
+    def test_counts_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.html")
+            write_output(path, "same".encode("utf-8"))
+            with OutputWriter() as writer:
+                writer.submit(path, "same")
+            self.assertEqual((writer.written, writer.unchanged), (0, 1))
+
+    def test_errors_are_collected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            blocker = os.path.join(tmp, "file")
+            write_output(blocker, b"not a directory")
+            writer = OutputWriter()
+            writer.submit(os.path.join(blocker, "index.html"), "x")
+            writer.submit(os.path.join(tmp, "ok", "index.html"), "y")
+            with self.assertRaises(ValueError) as context:
+                writer.close()
+            self.assertIn("1 output file(s) failed", str(context.exception))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "ok", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
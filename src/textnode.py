@@ -1,5 +1,7 @@
 from enum import Enum
 
+from leafnode import LeafNode
+
 class TextType(Enum):
     PLAIN = 1
     BOLD = 2
@@ -10,6 +12,7 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
 
     def __init__(self, text: str, text_type: TextType = TextType.PLAIN, url: str = None):
         self.text = text
@@ -26,8 +29,6 @@ class TextNode:
     
 
 def text_node_to_html_node(text_node):
-    from leafnode import LeafNode
-
     if text_node.text_type == TextType.PLAIN:
         return LeafNode(value=text_node.text)
     elif text_node.text_type == TextType.BOLD:
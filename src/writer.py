@@ -0,0 +1,79 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def write_output(path, data, known_dirs=None):
+    """Write bytes `data` to `path` unless the file already holds exactly them.
+
+    Leaving identical files alone keeps their mtimes stable for rsync and CDN
+    uploads. `known_dirs` is a set of directories already created, so each
+    directory is only created once per build. Returns True if the file was
+    written.
+    """
+    directory = os.path.dirname(path)
+    if known_dirs is None or directory not in known_dirs:
+        os.makedirs(directory or ".", exist_ok=True)
+        if known_dirs is not None:
+            known_dirs.add(directory)
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+class OutputWriter:
+    """Writes rendered pages from a background thread pool.
+
+    At most `max_pending` pages are queued at once; submit() waits for the
+    oldest write beyond that. close() waits for everything and raises a
+    ValueError listing any files that failed to write.
+    """
+
+    def __init__(self, workers=4, max_pending=64):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="output-writer")
+        self._dirs = set()
+        self._pending = deque()
+        self.max_pending = max_pending
+        self.written = 0
+        self.unchanged = 0
+        self.errors = []
+
+    def submit(self, path, text):
+        future = self._executor.submit(write_output, path, text.encode("utf-8"), self._dirs)
+        self._pending.append((path, future))
+        while len(self._pending) > self.max_pending:
+            self._collect(*self._pending.popleft())
+
+    def _collect(self, path, future):
+        try:
+            if future.result():
+                self.written += 1
+            else:
+                self.unchanged += 1
+        except OSError as e:
+            self.errors.append(f"{path}: {e}")
+
+    def close(self):
+        while self._pending:
+            self._collect(*self._pending.popleft())
+        self._executor.shutdown(wait=True)
+        if self.errors:
+            raise ValueError(f"{len(self.errors)} output file(s) failed to write:\n" + "\n".join(self.errors))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Let queued writes finish but keep the original error
+            self._executor.shutdown(wait=True)
+        return False